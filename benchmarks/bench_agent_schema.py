@@ -0,0 +1,84 @@
+"""Cost of building the agent schema for specs where many operations share components.
+
+Every operation uses a request model nesting the same ``$defs`` (``Address`` inside
+``Customer`` inside ``Order``). The resolver resolves each shared component once per
+document generation, so the time per operation stays flat as the spec grows. The
+cold runs invalidate the document first, so the whole catalog is rebuilt; the
+incremental runs register one more event, so only its catalog entry is built.
+The memoized catalog is measured, not the copy ``get_agent_schema()`` hands out.
+
+Run with::
+
+    python benchmarks/bench_agent_schema.py
+"""
+import time
+import timeit
+from typing import List
+
+from pydantic import BaseModel
+
+from sio_asyncapi.asyncapi.docs import AsyncAPIDoc
+
+SIZES = (100, 1_000)
+REPEAT = 5
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zip_code: str
+
+
+class Customer(BaseModel):
+    name: str
+    addresses: List[Address]
+
+
+class OrderLine(BaseModel):
+    sku: str
+    quantity: int
+
+
+class Order(BaseModel):
+    customer: Customer
+    lines: List[OrderLine]
+    shipping: Address
+
+
+def build_doc(operations: int) -> AsyncAPIDoc:
+    doc = AsyncAPIDoc.default_init()
+
+    def handler():
+        """Place an order"""
+
+    for index in range(operations):
+        doc.add_new_receiver(handler, f"order_{index}", payload_model=Order, ack_data_model=Customer)
+    return doc
+
+
+def bench_size(operations: int) -> None:
+    doc = build_doc(operations)
+
+    def cold_agent_schema():
+        doc.invalidate()
+        doc._agent_schema()
+
+    best = min(timeit.repeat(cold_agent_schema, number=1, repeat=REPEAT))
+    print(f"{operations:>6} operations, cold: {best * 1e3:9.2f} ms, {best / operations * 1e6:8.2f} us/operation")
+
+    incremental = []
+    for index in range(REPEAT):
+        doc.add_new_sender(f"customer_update_{index}", Customer)
+        start = time.perf_counter()
+        doc._agent_schema()
+        incremental.append(time.perf_counter() - start)
+    print(f"{operations:>6} operations, one new event: {min(incremental) * 1e3:9.2f} ms")
+
+
+def main() -> None:
+    for operations in SIZES:
+        bench_size(operations)
+
+
+if __name__ == "__main__":
+    main()
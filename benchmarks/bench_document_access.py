@@ -0,0 +1,66 @@
+"""Cost of reading an unchanged AsyncAPI document repeatedly.
+
+``dict()`` deep-copies the memoized document on every call, so each read costs as
+much as the document is large. ``document_view()`` freezes the document once per
+generation and then returns the same read-only view, so repeated reads are flat.
+``get_agent_schema()`` and ``agent_schema_view()`` do the same for the agent catalog.
+The first read of each accessor, which pays for building or freezing, is excluded.
+
+Run with::
+
+    python benchmarks/bench_document_access.py
+"""
+import timeit
+from typing import List
+
+from pydantic import BaseModel
+
+from sio_asyncapi.asyncapi.docs import AsyncAPIDoc
+
+SIZES = (100, 1_000)
+NUMBER = 20
+REPEAT = 5
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zip_code: str
+
+
+class Order(BaseModel):
+    """An order"""
+
+    sku: str
+    quantity: int
+    addresses: List[Address]
+
+
+def build_doc(operations: int) -> AsyncAPIDoc:
+    doc = AsyncAPIDoc.default_init()
+
+    def handler():
+        """Place an order"""
+
+    for index in range(operations):
+        doc.add_new_receiver(handler, f"order_{index}", payload_model=Order, ack_data_model=Address)
+    return doc
+
+
+def main() -> None:
+    for operations in SIZES:
+        doc = build_doc(operations)
+        accessors = {
+            "dict": doc.dict,
+            "document_view": doc.document_view,
+            "get_agent_schema": doc.get_agent_schema,
+            "agent_schema_view": doc.agent_schema_view,
+        }
+        for name, accessor in accessors.items():
+            accessor()
+            best = min(timeit.repeat(accessor, number=NUMBER, repeat=REPEAT)) / NUMBER
+            print(f"{operations:>6} operations, {name:<18}: {best * 1e6:12.2f} us/read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Events per second and per-event latency of the event hot path.
+
+Every scenario registers one handler on an ``AsyncAPISocketIO`` and sends events
+to it through ``SocketIOTestClient``, so the Socket.IO packet encoding, the
+validation wrapper, the handler and the ACK or emit serialization are all
+measured, as in a server without the network. The scenarios cover:
+
+* ``on``: request validation on/off, explicit models or typehints, with small,
+  large (a list of 1,000 items, like ``DownloaderQueueEmitModel``) and nested
+  payloads, plus a handler registered without models;
+* ``ack``: a response model returned as ACK and serialized;
+* ``emit``: a documented emit sent from the handler, validated or not;
+
+for Pydantic v2 models and Pydantic v1 models (``pydantic.v1`` on Pydantic 2).
+
+The results are printed and, with ``--output``, written as JSON; ``--compare``
+prints the change of events/s against a previous JSON file, e.g. the baseline
+taken before a performance change::
+
+    python benchmarks/bench_event_path.py --output baseline.json
+    # apply the change
+    python benchmarks/bench_event_path.py --output after.json --compare baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pydantic
+from flask import Flask
+from loguru import logger
+
+from sio_asyncapi import AsyncAPISocketIO
+from sio_asyncapi import _pydantic
+
+LARGE_ITEMS = 1_000
+NESTED_LINES = 20
+
+
+def define_models(base: type) -> Dict[str, type]:
+    """Return the request models of the payload sizes, subclassing ``base``."""
+
+    class Small(base):
+        id: int
+        name: str
+
+    class Item(base):
+        sku: str
+        quantity: int
+        price: float
+
+    class Large(base):
+        items: List[Item]
+
+    class Address(base):
+        street: str
+        city: str
+        zip_code: str
+
+    class Customer(base):
+        name: str
+        email: str
+        addresses: List[Address]
+
+    class Product(base):
+        sku: str
+        tags: List[str]
+        dimensions: Dict[str, float]
+
+    class Line(base):
+        product: Product
+        quantity: int
+        discount: Optional[float] = None
+
+    class Nested(base):
+        customer: Customer
+        lines: List[Line]
+
+    return {"small": Small, "large": Large, "nested": Nested}
+
+
+PAYLOADS: Dict[str, Any] = {
+    "small": {"id": 1, "name": "ping"},
+    "large": {
+        "items": [{"sku": f"sku-{index}", "quantity": index, "price": 9.5} for index in range(LARGE_ITEMS)]
+    },
+    "nested": {
+        "customer": {
+            "name": "Bob",
+            "email": "bob@example.com",
+            "addresses": [{"street": "1 Main St", "city": "Springfield", "zip_code": "12345"}] * 2,
+        },
+        "lines": [
+            {
+                "product": {
+                    "sku": f"sku-{index}",
+                    "tags": ["red", "large"],
+                    "dimensions": {"width": 1.0, "height": 2.0},
+                },
+                "quantity": index,
+            }
+            for index in range(NESTED_LINES)
+        ],
+    },
+}
+
+
+def model_flavors() -> Dict[str, type]:
+    """Return the base model of each Pydantic major version available."""
+    flavors: Dict[str, type] = {"pydantic_v1": _pydantic.BaseModel}
+    if pydantic.VERSION.startswith("2"):
+        flavors["pydantic_v2"] = pydantic.BaseModel
+    return flavors
+
+
+class Scenario:
+    """A handler registration and the event sent to it."""
+
+    def __init__(
+        self,
+        name: str,
+        register: Callable[[AsyncAPISocketIO], None],
+        payload: Any,
+        *,
+        validate: bool,
+        callback: bool = False,
+    ) -> None:
+        self.name = name
+        self.register = register
+        self.payload = payload
+        self.validate = validate
+        self.callback = callback
+
+
+def build_scenarios(flavor: str, models: Dict[str, type]) -> List[Scenario]:
+    scenarios = []
+
+    def register_raw(socketio: AsyncAPISocketIO) -> None:
+        @socketio.on("event")
+        def handler(request):
+            pass
+
+    for validate in (False, True):
+        scenarios.append(
+            Scenario(f"{flavor}/on/small/no_models/validate={validate}", register_raw, PAYLOADS["small"],
+                     validate=validate)
+        )
+
+    for size, model in models.items():
+        payload = PAYLOADS[size]
+
+        def register_explicit(socketio: AsyncAPISocketIO, model=model) -> None:
+            @socketio.on("event", request_model=model)
+            def handler(request):
+                pass
+
+        def register_typehint(socketio: AsyncAPISocketIO, model=model) -> None:
+            def handler(request) -> None:
+                pass
+
+            handler.__annotations__["request"] = model
+            socketio.on("event", get_from_typehint=True)(handler)
+
+        def register_ack(socketio: AsyncAPISocketIO, model=model) -> None:
+            @socketio.on("event", request_model=model, response_model=model)
+            def handler(request):
+                return request
+
+        def register_emit(socketio: AsyncAPISocketIO, model=model, payload=payload) -> None:
+            @socketio.doc_emit("pushed", model)
+            def pushed():
+                pass
+
+            @socketio.on("event")
+            def handler():
+                socketio.emit("pushed", payload)
+
+        for validate in (False, True):
+            scenarios.append(
+                Scenario(f"{flavor}/on/{size}/explicit/validate={validate}", register_explicit, payload,
+                         validate=validate)
+            )
+        scenarios.append(
+            Scenario(f"{flavor}/on/{size}/typehint/validate=True", register_typehint, payload, validate=True)
+        )
+        scenarios.append(
+            Scenario(f"{flavor}/ack/{size}/validate=True", register_ack, payload, validate=True, callback=True)
+        )
+        for validate in (False, True):
+            scenarios.append(
+                Scenario(f"{flavor}/emit/{size}/validate={validate}", register_emit, None, validate=validate)
+            )
+    return scenarios
+
+
+def run_scenario(scenario: Scenario, events: int, warmup: int) -> Dict[str, Any]:
+    """Send ``warmup`` then ``events`` events and return the throughput and latencies."""
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=scenario.validate, generate_docs=False)
+    scenario.register(socketio)
+    client = socketio.test_client(app)
+    args = () if scenario.payload is None else (scenario.payload,)
+
+    def send() -> int:
+        start = time.perf_counter_ns()
+        client.emit("event", *args, callback=scenario.callback)
+        elapsed = time.perf_counter_ns() - start
+        # drop the packets emitted to the client outside of the timed section
+        client.get_received()
+        return elapsed
+
+    for _ in range(warmup):
+        send()
+    latencies = [send() for _ in range(events)]
+    client.disconnect()
+
+    total = sum(latencies)
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "scenario": scenario.name,
+        "events": events,
+        "events_per_second": events / (total / 1e9),
+        "latency_us": {
+            "mean": total / events / 1e3,
+            "p50": percentiles[49] / 1e3,
+            "p90": percentiles[89] / 1e3,
+            "p99": percentiles[98] / 1e3,
+            "max": max(latencies) / 1e3,
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    baseline = {
+        entry["scenario"]: entry for entry in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\nevents/s compared with {baseline_path}")
+    for entry in results:
+        previous = baseline.get(entry["scenario"])
+        if previous is None:
+            continue
+        change = entry["events_per_second"] / previous["events_per_second"] - 1
+        print(f"  {entry['scenario']:<55} {change:+8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=2_000, help="timed events per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="untimed events per scenario")
+    parser.add_argument("--filter", default="", help="only run the scenarios containing this text")
+    parser.add_argument("--output", help="JSON file receiving the results")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    options = parser.parse_args()
+    logger.disable("sio_asyncapi")
+
+    results = []
+    for flavor, base in model_flavors().items():
+        for scenario in build_scenarios(flavor, define_models(base)):
+            if options.filter not in scenario.name:
+                continue
+            result = run_scenario(scenario, options.events, options.warmup)
+            results.append(result)
+            latency = result["latency_us"]
+            print(
+                f"{scenario.name:<55} {result['events_per_second']:>10,.0f} events/s  "
+                f"p50 {latency['p50']:8.1f} us  p99 {latency['p99']:8.1f} us"
+            )
+
+    if options.output:
+        content = {
+            "metadata": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "revision": git_revision(),
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "pydantic": pydantic.VERSION,
+                "events": options.events,
+                "warmup": options.warmup,
+            },
+            "results": results,
+        }
+        Path(options.output).write_text(json.dumps(content, indent=2) + "\n", encoding="utf-8")
+    if options.compare:
+        compare(results, options.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time and peak memory of exporting very large AsyncAPI documents.
+
+``get_yaml()``/``json()`` copy the whole document and encode it as one string;
+``write_yaml()``/``write_json()`` encode one channel, operation and component at
+a time into a stream. The peak memory allocated by the export (the document
+itself excluded) is measured with ``tracemalloc``: it grows with the number of
+operations for the first ones and stays flat for the streaming ones.
+
+Run with::
+
+    python benchmarks/bench_export.py
+"""
+import io
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import BaseModel
+
+from sio_asyncapi.asyncapi.docs import AsyncAPIDoc
+
+SIZES = (1_000, 4_000, 16_000)
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zip_code: str
+
+
+class Order(BaseModel):
+    """An order"""
+
+    sku: str
+    quantity: int
+    addresses: List[Address]
+
+
+class NullStream(io.StringIO):
+    """Text stream discarding what is written, like a socket to a fast client."""
+
+    def write(self, chunk: str) -> int:
+        return len(chunk)
+
+
+def build_doc(operations: int) -> AsyncAPIDoc:
+    doc = AsyncAPIDoc.default_init()
+
+    def handler():
+        """Place an order"""
+
+    for index in range(operations):
+        doc.add_new_receiver(handler, f"order_{index}", payload_model=Order, ack_data_model=Address)
+    return doc
+
+
+def measure(doc: AsyncAPIDoc, export) -> tuple[float, float]:
+    """Return the seconds taken and the peak MiB allocated by ``export()``.
+
+    Both start from an invalidated document; tracemalloc slows the export down, so
+    it is timed in a separate run.
+    """
+    doc.invalidate()
+    start = time.perf_counter()
+    export()
+    elapsed = time.perf_counter() - start
+
+    doc.invalidate()
+    tracemalloc.start()
+    export()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    for operations in SIZES:
+        doc = build_doc(operations)
+        exports = {
+            "get_yaml": doc.get_yaml,
+            "write_yaml": lambda: doc.write_yaml(NullStream()),
+            "json": doc.json,
+            "write_json": lambda: doc.write_json(NullStream()),
+        }
+        for name, export in exports.items():
+            elapsed, peak = measure(doc, export)
+            print(f"{operations:>6} operations, {name:<10}: {elapsed * 1e3:9.1f} ms, peak {peak:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
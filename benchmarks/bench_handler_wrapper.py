@@ -0,0 +1,82 @@
+"""Per-event cost of building the validation wrapper inside the event path.
+
+Compares a handler registered through ``AsyncAPISocketIO.on`` (wrapper built
+once at decoration time) with the previous behaviour of rebuilding the
+``_handle_all`` wrapper for every incoming event.
+
+Run with::
+
+    python benchmarks/bench_handler_wrapper.py
+"""
+import timeit
+
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPISocketIO
+
+EVENTS_PER_SECOND = 100_000
+NUMBER = 20_000
+REPEAT = 5
+
+
+class PingRequest(BaseModel):
+    count: int
+
+
+class PingResponse(BaseModel):
+    count: int
+
+
+def build_socketio() -> AsyncAPISocketIO:
+    return AsyncAPISocketIO(Flask(__name__), validate=True, generate_docs=False)
+
+
+def bench_scenario(name, request_model, response_model, handler, payload) -> None:
+    socketio = build_socketio()
+    prebuilt = socketio.on(
+        name,
+        request_model=request_model,
+        response_model=response_model,
+    )(handler)
+
+    def rebuilt_per_event():
+        return socketio._handle_all(
+            request_model=request_model,
+            response_model=response_model,
+        )(handler)(payload)
+
+    def built_once():
+        return prebuilt(payload)
+
+    results = {}
+    for variant, func in (("rebuilt_per_event", rebuilt_per_event), ("built_once", built_once)):
+        best = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT))
+        results[variant] = best / NUMBER * 1e6
+
+    saved_us = results["rebuilt_per_event"] - results["built_once"]
+    print(name)
+    for variant, per_event_us in results.items():
+        print(f"  {variant:>18}: {per_event_us:8.3f} us/event")
+    print(
+        f"  {'saved':>18}: {saved_us:8.3f} us/event "
+        f"({saved_us * EVENTS_PER_SECOND / 1e6:.3f} CPU-seconds per second at "
+        f"{EVENTS_PER_SECOND:,} events/s)"
+    )
+
+
+def handle_ping(request: PingRequest) -> PingResponse:
+    return PingResponse(count=request.count)
+
+
+def handle_raw(request):
+    return request
+
+
+def main() -> None:
+    bench_scenario("with_models", PingRequest, PingResponse, handle_ping, {"count": 1})
+    bench_scenario("without_models", None, None, handle_raw, {"count": 1})
+
+
+if __name__ == "__main__":
+    main()
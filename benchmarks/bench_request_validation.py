@@ -0,0 +1,80 @@
+"""Per-event CPU cost of validating the request payload once versus twice.
+
+``_handle_all`` used to validate the request payload to raise
+``RequestValidationError`` and then validate it again to build the model passed
+to the handler. This compares that double pass with the single pass now used,
+for a flat request model and for a nested one. Both variants run through the
+same ``on`` wrapper; the double pass adds the former error-checking validation
+in front of it, so the difference is the cost of that extra pass only.
+
+Run with::
+
+    python benchmarks/bench_request_validation.py
+"""
+import timeit
+from pathlib import Path
+from typing import List, Optional
+
+from flask import Flask
+from pydantic import AnyUrl, BaseModel, Field
+
+from sio_asyncapi import AsyncAPISocketIO
+from sio_asyncapi._compat import model_validate
+
+NUMBER = 20_000
+REPEAT = 5
+
+
+class DownloadFileRequest(BaseModel):
+    """Request model for download file"""
+    url: AnyUrl = Field(..., description="URL to download")
+    location: Path = Field(..., description="Destination local to file system")
+    check_hash: Optional[bool] = False
+
+
+class DownloadBatchRequest(BaseModel):
+    """Nested request model wrapping several downloads"""
+    files: List[DownloadFileRequest]
+    priority: int = 0
+
+
+FILE_PAYLOAD = {
+    "url": "https://cdn.pixabay.com/photo/2015/04/23/22/00/tree-736885__480.jpg",
+    "location": "/tmp/tree.jpg",
+}
+BATCH_PAYLOAD = {"files": [FILE_PAYLOAD] * 10, "priority": 1}
+
+
+def bench_model(name, model, payload) -> None:
+    socketio = AsyncAPISocketIO(Flask(__name__), validate=True, generate_docs=False)
+
+    def handler(request):
+        return None
+
+    wrapped = socketio.on(name, request_model=model)(handler)
+
+    def single_pass():
+        return wrapped(payload)
+
+    def double_pass():
+        model_validate(model, payload)
+        return wrapped(payload)
+
+    results = {}
+    for variant, func in (("double_pass", double_pass), ("single_pass", single_pass)):
+        best = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT))
+        results[variant] = best / NUMBER * 1e6
+
+    print(name)
+    for variant, per_event_us in results.items():
+        print(f"  {variant:>12}: {per_event_us:8.3f} us/event")
+    print(f"  {'saved':>12}: {results['double_pass'] - results['single_pass']:8.3f} us/event")
+
+
+def main() -> None:
+    bench_model("download_file", DownloadFileRequest, FILE_PAYLOAD)
+    bench_model("download_batch", DownloadBatchRequest, BATCH_PAYLOAD)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,23 @@
+from ._compat import ModelAdapter, register_model_adapter
+from .allocations import AllocationTracker
 from .application import (AsyncAPISocketIO, EmitValidationError,
                           RequestValidationError, ResponseValidationError)
+from .async_server import AsyncAPIAsyncServer
+from .metrics import MetricsRegistry
+from .offload import ValidationOffload
+from .tracing import Tracer
+from .validation import ValidationPolicy
 
 __all__ = [
     "AsyncAPISocketIO",
+    "AsyncAPIAsyncServer",
+    "AllocationTracker",
     "RequestValidationError",
     "ResponseValidationError",
-    "EmitValidationError"]
+    "EmitValidationError",
+    "MetricsRegistry",
+    "ModelAdapter",
+    "Tracer",
+    "ValidationOffload",
+    "ValidationPolicy",
+    "register_model_adapter"]
@@ -1,11 +1,34 @@
+import collections.abc
+import dataclasses
 import json
-from typing import Any, Type
+import types
+import typing
+import weakref
+from typing import Any, Callable, Optional, Type
 
 from pydantic import BaseModel as BaseModelV2
 from pydantic import ValidationError as ValidationErrorV2
 
 from sio_asyncapi._pydantic import BaseModel as BaseModelV1Compat
 from sio_asyncapi._pydantic import ValidationError as ValidationErrorV1Compat
+from sio_asyncapi._pydantic import parse_obj_as, pydantic_encoder, schema_of
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pragma: no cover
+    TypeAdapter = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+# Class of a supported model: a Pydantic v1/v2 model, a dataclass, a msgspec.Struct
+# or a kind added with register_model_adapter; they share no common base class.
+ModelType = Type[Any]
+
+# ``X | Y`` annotations (Python 3.10+)
+_UnionType = getattr(types, "UnionType", None)
 
 PYDANTIC_MODEL_TYPES = tuple(
     model_type
@@ -19,6 +42,11 @@ PYDANTIC_VALIDATION_ERRORS = tuple(
     if isinstance(error_type, type)
 )
 
+# Errors raised by the validators of every registered model kind.
+MODEL_VALIDATION_ERRORS = PYDANTIC_VALIDATION_ERRORS + (
+    (msgspec.ValidationError,) if msgspec is not None else ()
+)
+
 
 def is_pydantic_model_type(model: Any) -> bool:
     """Return True when the value is a supported Pydantic model class."""
@@ -30,36 +58,401 @@ def is_pydantic_model_instance(value: Any) -> bool:
     return isinstance(value, PYDANTIC_MODEL_TYPES)
 
 
+class ModelAdapter:
+    """Validation, serialization and schema fast paths for a single model class.
+
+    Adapters are resolved once per class by :func:`get_model_adapter`, so the
+    hot paths do not have to pick between model libraries or the Pydantic v1 and
+    v2 APIs on every call.
+    """
+
+    __slots__ = (
+        "model",
+        "validate",
+        "construct",
+        "dump",
+        "dump_jsonable",
+        "dump_json",
+        "schema",
+        "cacheable",
+    )
+
+    def __init__(
+        self,
+        model: Type[Any],
+        *,
+        validate: Callable[[Any], Any],
+        dump: Callable[[Any], dict[str, Any]],
+        dump_jsonable: Callable[[Any], Any],
+        dump_json: Callable[[Any], str],
+        schema: Callable[[], dict[str, Any]],
+        construct: Optional[Callable[[Any], Any]] = None,
+        cacheable: bool = True,
+    ) -> None:
+        self.model = model
+        self.validate = validate
+        self.construct = construct or validate
+        self.dump = dump
+        self.dump_jsonable = dump_jsonable
+        self.dump_json = dump_json
+        self.schema = schema
+        self.cacheable = cacheable
+
+
+def _references_model(annotation: Any) -> bool:
+    """Return True when a field annotation contains a supported model class."""
+    pending = [annotation]
+    while pending:
+        annotation = pending.pop()
+        if is_model_type(annotation):
+            return True
+        pending.extend(typing.get_args(annotation))
+    return False
+
+
+def _construct_value(annotation: Any, value: Any) -> Any:
+    """Build the model instances nested in ``value`` as described by ``annotation``, unvalidated."""
+    if isinstance(annotation, type):
+        if isinstance(value, dict) and is_model_type(annotation):
+            return get_model_adapter(annotation).construct(value)
+        return value
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Annotated:
+        return _construct_value(args[0], value)
+    if origin is typing.Union or (_UnionType is not None and origin is _UnionType):
+        for arg in args:
+            built = _construct_value(arg, value)
+            if built is not value:
+                return built
+        return value
+    if isinstance(value, list) and args:
+        if origin is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+            return [_construct_value(arg, item) for arg, item in zip(args, value)] + value[len(args):]
+        if origin in (list, set, frozenset, tuple, collections.abc.Sequence, collections.abc.Iterable):
+            return [_construct_value(args[0], item) for item in value]
+    if isinstance(value, dict) and len(args) == 2 and origin in (dict, collections.abc.Mapping):
+        return {key: _construct_value(args[1], item) for key, item in value.items()}
+    return value
+
+
+def _unvalidated_constructor(
+    model: Type[Any],
+    construct: Callable[..., Any],
+    get_fields: Callable[[], list[tuple[tuple[str, ...], Any]]],
+) -> Callable[[Any], Any]:
+    """Build model instances from dict payloads without validating them.
+
+    ``get_fields`` returns the payload keys (name and alias) and annotation of the
+    model fields; the dicts of the fields holding models are built into instances
+    too, recursively. Payloads that are not dicts, or cannot be built, are returned
+    as received: skipping validation must not cost a validation.
+    """
+    nested_fields: Optional[list[tuple[tuple[str, ...], Any]]] = None
+
+    def construct_unvalidated(data: Any) -> Any:
+        nonlocal nested_fields
+        if isinstance(data, model):
+            return data
+        if not isinstance(data, dict):
+            return data
+        if nested_fields is None:
+            # Resolved on first use, once the forward refs of the model are defined.
+            nested_fields = [
+                (keys, annotation) for keys, annotation in get_fields() if _references_model(annotation)
+            ]
+        if nested_fields:
+            data = dict(data)
+            for keys, annotation in nested_fields:
+                for key in keys:
+                    if key in data:
+                        data[key] = _construct_value(annotation, data[key])
+        try:
+            return construct(**data)
+        except TypeError:  # e.g. missing or unknown dataclass fields
+            return data
+
+    return construct_unvalidated
+
+
+def _pydantic_v2_fields(model: Type[Any]) -> list[tuple[tuple[str, ...], Any]]:
+    return [
+        ((name,) if field.alias in (None, name) else (field.alias, name), field.annotation)
+        for name, field in model.model_fields.items()
+    ]
+
+
+def _pydantic_v1_fields(model: Type[Any]) -> list[tuple[tuple[str, ...], Any]]:
+    return [
+        ((name,) if field.alias == name else (field.alias, name), field.outer_type_)
+        for name, field in model.__fields__.items()
+    ]
+
+
+def _dataclass_fields(model: Type[Any]) -> list[tuple[tuple[str, ...], Any]]:
+    hints = typing.get_type_hints(model)
+    return [((field.name,), hints.get(field.name)) for field in dataclasses.fields(model) if field.init]
+
+
+def _pydantic_v2_adapter(model: Type[Any]) -> ModelAdapter:
+    serializer = model.__pydantic_serializer__
+    validate = model.__pydantic_validator__.validate_python
+    return ModelAdapter(
+        model,
+        validate=validate,
+        construct=_unvalidated_constructor(model, model.model_construct, lambda: _pydantic_v2_fields(model)),
+        dump=serializer.to_python,
+        dump_jsonable=lambda instance: serializer.to_python(instance, mode="json"),
+        dump_json=lambda instance: serializer.to_json(instance).decode(),
+        schema=model.model_json_schema,
+    )
+
+
+def _pydantic_v1_adapter(model: Type[Any]) -> ModelAdapter:
+    return ModelAdapter(
+        model,
+        validate=model.parse_obj,
+        construct=_unvalidated_constructor(model, model.construct, lambda: _pydantic_v1_fields(model)),
+        dump=lambda instance: instance.dict(),
+        dump_jsonable=lambda instance: json.loads(instance.json()),
+        dump_json=lambda instance: instance.json(),
+        schema=model.schema,
+    )
+
+
+def _pydantic_generic_adapter(model: Type[Any]) -> ModelAdapter:
+    """Adapter for v2 models whose validator is not built yet (e.g. pending forward refs)."""
+    return ModelAdapter(
+        model,
+        validate=model.model_validate,
+        construct=_unvalidated_constructor(model, model.model_construct, lambda: _pydantic_v2_fields(model)),
+        dump=lambda instance: instance.model_dump(),
+        dump_jsonable=lambda instance: instance.model_dump(mode="json"),
+        dump_json=lambda instance: instance.model_dump_json(),
+        schema=model.model_json_schema,
+        cacheable=False,
+    )
+
+
+def _pydantic_adapter(model: Type[Any]) -> ModelAdapter:
+    if not hasattr(model, "model_validate"):
+        return _pydantic_v1_adapter(model)
+    if not getattr(model, "__pydantic_complete__", True):
+        # Not cached: the model is rebuilt once its forward refs resolve.
+        return _pydantic_generic_adapter(model)
+    return _pydantic_v2_adapter(model)
+
+
+def _is_dataclass_type(model: Type[Any]) -> bool:
+    return dataclasses.is_dataclass(model)
+
+
+def _dataclass_adapter(model: Type[Any]) -> ModelAdapter:
+    """Dataclasses are validated with a Pydantic ``TypeAdapter`` (``parse_obj_as`` on v1)."""
+    if TypeAdapter is not None:
+        type_adapter = TypeAdapter(model)
+        return ModelAdapter(
+            model,
+            validate=type_adapter.validate_python,
+            construct=_unvalidated_constructor(model, model, lambda: _dataclass_fields(model)),
+            dump=type_adapter.dump_python,
+            dump_jsonable=lambda instance: type_adapter.dump_python(instance, mode="json"),
+            dump_json=lambda instance: type_adapter.dump_json(instance).decode(),
+            schema=type_adapter.json_schema,
+        )
+
+    def validate(data: Any) -> Any:
+        if isinstance(data, model):
+            return data
+        return parse_obj_as(model, data)
+
+    def dump_json(instance: Any) -> str:
+        return json.dumps(dataclasses.asdict(instance), default=pydantic_encoder)
+
+    return ModelAdapter(
+        model,
+        validate=validate,
+        construct=_unvalidated_constructor(model, model, lambda: _dataclass_fields(model)),
+        dump=dataclasses.asdict,
+        dump_jsonable=lambda instance: json.loads(dump_json(instance)),
+        dump_json=dump_json,
+        schema=lambda: schema_of(model),
+    )
+
+
+def _is_msgspec_struct_type(model: Type[Any]) -> bool:
+    return msgspec is not None and issubclass(model, msgspec.Struct)
+
+
+def _msgspec_fields(model: Type[Any]) -> list[tuple[tuple[str, ...], Any]]:
+    if msgspec is None:  # pragma: no cover
+        return []
+    return [
+        (tuple(dict.fromkeys((field.encode_name, field.name))), field.type)
+        for field in msgspec.structs.fields(model)
+    ]
+
+
+def _msgspec_adapter(model: Type[Any]) -> ModelAdapter:
+    if msgspec is None:  # pragma: no cover
+        raise TypeError(f"{model!r} needs msgspec, which is not installed")
+    convert = msgspec.convert
+    encode = msgspec.json.encode
+    json_schema = msgspec.json.schema
+
+    def validate(data: Any) -> Any:
+        if isinstance(data, model):
+            return data
+        return convert(data, type=model)
+
+    return ModelAdapter(
+        model,
+        validate=validate,
+        construct=_unvalidated_constructor(model, model, lambda: _msgspec_fields(model)),
+        dump=msgspec.structs.asdict,
+        dump_jsonable=msgspec.to_builtins,
+        dump_json=lambda instance: encode(instance).decode(),
+        schema=lambda: json_schema(model),
+    )
+
+
+ModelAdapterFactory = Callable[[Type[Any]], ModelAdapter]
+
+# (predicate, factory) pairs, checked in order; see :func:`register_model_adapter`.
+_ADAPTER_FACTORIES: list[tuple[Callable[[Type[Any]], bool], ModelAdapterFactory]] = [
+    (is_pydantic_model_type, _pydantic_adapter),
+    (_is_msgspec_struct_type, _msgspec_adapter),
+    (_is_dataclass_type, _dataclass_adapter),
+]
+
+
+def register_model_adapter(
+    predicate: Callable[[Type[Any]], bool],
+    factory: ModelAdapterFactory,
+    *,
+    validation_errors: tuple[Type[Exception], ...] = (),
+) -> None:
+    """Add support for another kind of model class.
+
+    Args:
+        predicate (Callable[[type], bool]): returns True for the classes handled by ``factory``.
+        factory (ModelAdapterFactory): builds the :class:`ModelAdapter` of a class.
+        validation_errors (tuple[Type[Exception], ...], optional): exceptions raised by the
+            adapter's ``validate`` on invalid data. Defaults to ().
+    """
+    global MODEL_VALIDATION_ERRORS
+    _ADAPTER_FACTORIES.insert(0, (predicate, factory))
+    MODEL_VALIDATION_ERRORS = tuple(dict.fromkeys(MODEL_VALIDATION_ERRORS + validation_errors))
+    _MODEL_ADAPTERS.clear()
+    _NON_MODEL_TYPES.clear()
+    _NON_MODEL_TYPES.update(_BUILTIN_TYPES)
+
+
+# Payload types checked first: ACKs and emits are mostly plain JSON values.
+_BUILTIN_TYPES = frozenset({type(None), dict, list, tuple, str, int, float, bool, bytes})
+
+# Classes found not to be models. A plain set, since it is checked for every emit and
+# ACK payload; it only grows with the classes of the payloads sent.
+_NON_MODEL_TYPES: set[type] = set(_BUILTIN_TYPES)
+
+_MODEL_TYPES: "weakref.WeakSet[type]" = weakref.WeakSet()
+
+
+def is_model_type(model: Any) -> bool:
+    """Return True when the value is a class supported by a registered model adapter."""
+    if not isinstance(model, type) or model in _NON_MODEL_TYPES:
+        return False
+    if model in _MODEL_TYPES:
+        return True
+    if any(predicate(model) for predicate, _ in _ADAPTER_FACTORIES):
+        _MODEL_TYPES.add(model)
+        return True
+    _NON_MODEL_TYPES.add(model)
+    return False
+
+
+def is_model_instance(value: Any) -> bool:
+    """Return True when the value is an instance of a supported model class."""
+    cls = type(value)
+    if cls in _NON_MODEL_TYPES:
+        return False
+    return is_model_type(cls)
+
+
+_MODEL_ADAPTERS: "weakref.WeakKeyDictionary[type, ModelAdapter]" = weakref.WeakKeyDictionary()
+
+
+def get_model_adapter(model: Type[Any]) -> ModelAdapter:
+    """Return the cached :class:`ModelAdapter` for a supported model class."""
+    adapter = _MODEL_ADAPTERS.get(model)
+    if adapter is not None:
+        return adapter
+
+    if isinstance(model, type):
+        for predicate, factory in _ADAPTER_FACTORIES:
+            if predicate(model):
+                adapter = factory(model)
+                if adapter.cacheable:
+                    _MODEL_ADAPTERS[model] = adapter
+                return adapter
+    raise TypeError(f"{model!r} is not a supported model class")
+
+
+def referenced_classes(model: Type[Any]) -> list[type]:
+    """Return the model, its bases and the classes used in the annotations, recursively."""
+    classes: list[type] = []
+    pending: list[Any] = [model]
+    while pending:
+        annotation = pending.pop()
+        pending.extend(typing.get_args(annotation))
+        origin = typing.get_origin(annotation)
+        if origin is not None:
+            pending.append(origin)
+        if not isinstance(annotation, type) or annotation in classes:
+            continue
+        classes.append(annotation)
+        if annotation.__module__ == "builtins":
+            continue
+        pending.extend(annotation.__mro__[1:])
+        pending.extend(typing.get_type_hints(annotation).values())
+    return classes
+
+
 def model_validate(model: Type[Any], data: Any) -> Any:
-    """Validate data against either a Pydantic v1 or v2 model class."""
-    if hasattr(model, "model_validate"):
-        return model.model_validate(data)
-    return model.parse_obj(data)
+    """Validate data against a supported model class."""
+    return get_model_adapter(model).validate(data)
 
 
 def model_schema(model: Type[Any]) -> dict[str, Any]:
-    """Return a JSON schema for either a Pydantic v1 or v2 model class."""
-    if hasattr(model, "model_json_schema"):
-        return model.model_json_schema()
-    return model.schema()
+    """Return a JSON schema for a supported model class."""
+    return get_model_adapter(model).schema()
 
 
 def model_dump(instance: Any, **kwargs: Any) -> dict[str, Any]:
     """Dump a model to a Python dict for either Pydantic major version."""
+    if not kwargs:
+        return get_model_adapter(type(instance)).dump(instance)
     if hasattr(instance, "model_dump"):
         return instance.model_dump(**kwargs)
     return instance.dict(**kwargs)
 
 
+def model_dump_jsonable(instance: Any) -> Any:
+    """Dump a model to JSON-compatible Python values for either Pydantic major version."""
+    return get_model_adapter(type(instance)).dump_jsonable(instance)
+
+
 def model_dump_json(instance: Any, **kwargs: Any) -> str:
     """Dump a model to JSON for either Pydantic major version."""
+    if not kwargs:
+        return get_model_adapter(type(instance)).dump_json(instance)
     if hasattr(instance, "model_dump_json"):
         return instance.model_dump_json(**kwargs)
     return instance.json(**kwargs)
 
 
 class BaseValidationError(Exception):
-    """Version-agnostic wrapper around a Pydantic validation error."""
+    """Library-agnostic wrapper around a model validation error."""
 
     def __init__(self, parent: Exception):
         super().__init__(str(parent))
@@ -72,7 +465,9 @@ class BaseValidationError(Exception):
         return cls(parent)
 
     def errors(self) -> list[dict[str, Any]]:
-        return self.parent.errors()
+        if hasattr(self.parent, "errors"):
+            return self.parent.errors()
+        return [{"msg": str(self.parent)}]
 
     def json(self, *args: Any, **kwargs: Any) -> str:
         if hasattr(self.parent, "json"):
@@ -6,9 +6,12 @@ try:
         Field,
         ValidationError,
         constr,
+        parse_obj_as,
         root_validator,
+        schema_of,
         validator,
     )
+    from pydantic.v1.json import pydantic_encoder
 except ImportError:  # pragma: no cover
     from pydantic import (
         AnyUrl,
@@ -17,9 +20,12 @@ except ImportError:  # pragma: no cover
         Field,
         ValidationError,
         constr,
+        parse_obj_as,
         root_validator,
+        schema_of,
         validator,
     )
+    from pydantic.json import pydantic_encoder
 
 __all__ = [
     "AnyUrl",
@@ -28,6 +34,9 @@ __all__ = [
     "Field",
     "ValidationError",
     "constr",
+    "parse_obj_as",
+    "pydantic_encoder",
     "root_validator",
+    "schema_of",
     "validator",
 ]
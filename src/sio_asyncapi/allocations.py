@@ -0,0 +1,198 @@
+"""Per-event memory allocation tracking with tracemalloc."""
+import json
+import os
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from sio_asyncapi.metrics import MetricsRegistry
+
+# Bytes: 1 KiB to 1 GiB by powers of 4.
+BYTES_BUCKETS: Tuple[float, ...] = tuple(float(1024 * 4**power) for power in range(11))
+
+
+class AllocationStats:
+    """Memory allocated by one processing phase of an (event, namespace)."""
+
+    def __init__(self, event: str, namespace: str, phase: str, subject: str) -> None:
+        self.event = event
+        self.namespace = namespace
+        self.phase = phase
+        self.subject = subject
+        self.calls = 0
+        self.net_bytes_total = 0
+        self.peak_bytes_total = 0
+        self.peak_bytes_max = 0
+        self._lock = threading.Lock()
+
+    def record(self, net: int, peak: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.net_bytes_total += net
+            self.peak_bytes_total += peak
+            self.peak_bytes_max = max(self.peak_bytes_max, peak)
+
+    def to_dict(self) -> Dict[str, Any]:
+        calls = self.calls or 1
+        return {
+            "event": self.event,
+            "namespace": self.namespace,
+            "phase": self.phase,
+            "subject": self.subject,
+            "calls": self.calls,
+            "net_bytes_total": self.net_bytes_total,
+            "net_bytes_mean": self.net_bytes_total / calls,
+            "peak_bytes_mean": self.peak_bytes_total / calls,
+            "peak_bytes_max": self.peak_bytes_max,
+        }
+
+
+class AllocationTracker:
+    """Record the peak and net memory allocated by the phases of tracked events.
+
+    The peak is the highest traced memory above the one at the start of the
+    phase; the net is the memory still allocated at its end (negative when the
+    phase freed more than it allocated). tracemalloc is started on first use.
+    Its counters are process wide: events processed concurrently, including
+    other tasks scheduled while a coroutine handler awaits, are counted in each
+    other's figures, so track few events at a time, or on a single worker.
+
+    Example::
+        @socketio.on("queue", request_model=DownloaderQueueEmitModel, track_allocations=True)
+        def queue(request):
+            ...
+
+        socketio.allocation_tracker.dump("/tmp/allocations.json")
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None, nframes: int = 1) -> None:
+        """Create a tracker
+
+        Args:
+            metrics (Optional[MetricsRegistry], optional): registry receiving the
+                ``sio_asyncapi_peak_allocation_bytes`` and
+                ``sio_asyncapi_retained_allocation_bytes`` histograms and the
+                ``sio_asyncapi_freed_allocation_bytes_total`` counter, since histograms
+                only take positive net allocations. Defaults to None.
+            nframes (int, optional): frames stored per allocation when this tracker
+                starts tracemalloc; more frames make :meth:`dump_tracemalloc` snapshots
+                more precise and tracing slower. Defaults to 1.
+        """
+        self.metrics = metrics
+        self.nframes = nframes
+        self._stats: Dict[Tuple[str, str, str], AllocationStats] = {}
+        self._lock = threading.Lock()
+        if metrics is not None:
+            metrics.describe("sio_asyncapi_peak_allocation_bytes", "Peak memory allocated per event and phase.")
+            metrics.describe(
+                "sio_asyncapi_retained_allocation_bytes", "Memory still allocated at the end of a phase."
+            )
+            metrics.describe(
+                "sio_asyncapi_freed_allocation_bytes_total", "Memory freed by phases ending below their start."
+            )
+
+    def stats(self, event: str, namespace: str, phase: str, subject: str = "") -> AllocationStats:
+        """Return the statistics of a phase of an event, created on first use."""
+        key = (event, namespace, phase)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = AllocationStats(event, namespace, phase, subject)
+        return stats
+
+    def _recorder(self, event: str, namespace: str, phase: str, subject: str) -> Callable[[int, int], None]:
+        stats = self.stats(event, namespace, phase, subject)
+        if self.metrics is None:
+            return stats.record
+        labels = (("event", event), ("namespace", namespace), ("phase", phase))
+        peak_histogram = self.metrics.histogram("sio_asyncapi_peak_allocation_bytes", labels, BYTES_BUCKETS)
+        retained_histogram = self.metrics.histogram(
+            "sio_asyncapi_retained_allocation_bytes", labels, BYTES_BUCKETS
+        )
+        freed_counter = self.metrics.counter("sio_asyncapi_freed_allocation_bytes_total", labels)
+
+        def record(net: int, peak: int) -> None:
+            stats.record(net, peak)
+            peak_histogram.observe(peak)
+            retained_histogram.observe(max(net, 0))
+            if net < 0:
+                freed_counter.inc(-net)
+
+        return record
+
+    def _start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+
+    def tracked(self, event: str, namespace: str, phase: str, func: Callable, subject: str = "") -> Callable:
+        """Wrap ``func`` to record the memory allocated by its calls.
+
+        Args:
+            event (str): event name
+            namespace (str): event namespace
+            phase (str): processing phase, e.g. "request_validation"
+            func (Callable): function to wrap
+            subject (str, optional): model or handler name reported with the
+                statistics. Defaults to "".
+        """
+        record = self._recorder(event, namespace, phase, subject)
+        self._start()
+
+        def tracked_func(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return func(*args, **kwargs)
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                record(current - before, peak - before)
+
+        return tracked_func
+
+    def tracked_async(
+        self,
+        event: str,
+        namespace: str,
+        phase: str,
+        func: Callable,
+        subject: str = "",
+    ) -> Callable:
+        """Coroutine version of :meth:`tracked`."""
+        record = self._recorder(event, namespace, phase, subject)
+        self._start()
+
+        async def tracked_func(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return await func(*args, **kwargs)
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                record(current - before, peak - before)
+
+        return tracked_func
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return the statistics of every tracked phase, largest peak first."""
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted((entry.to_dict() for entry in stats), key=lambda entry: -entry["peak_bytes_max"])
+
+    def dump(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Write :meth:`snapshot` and the traced memory totals to a JSON file."""
+        current, peak = tracemalloc.get_traced_memory()
+        content = {
+            "traced_memory": {"current_bytes": current, "peak_bytes": peak},
+            "events": self.snapshot(),
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(content, file, indent=2)
+
+    def dump_tracemalloc(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Write a :class:`tracemalloc.Snapshot` of the live allocations, e.g. to compare
+        two releases with ``Snapshot.load(path).compare_to(...)``."""
+        tracemalloc.take_snapshot().dump(str(path))
@@ -0,0 +1,165 @@
+"""AsyncAPI validation and documentation for ``socketio.AsyncServer`` (asyncio/ASGI)."""
+import contextvars
+import functools
+import inspect
+from typing import Callable, Optional, Union
+
+import socketio
+
+from sio_asyncapi._compat import ModelType
+from sio_asyncapi.asyncapi.docs import NotProvidedType
+from sio_asyncapi.base import AsyncAPIBase, normalize_namespace
+from sio_asyncapi.offload import ValidationOffload
+from sio_asyncapi.validation import ValidationPolicy
+
+# sid of the client whose event is being handled, like ``flask.request.sid`` for Flask-SocketIO
+_serving_sid: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("sio_asyncapi_sid", default=None)
+
+
+class AsyncAPIAsyncServer(AsyncAPIBase, socketio.AsyncServer):
+    """Inherits the :class:`socketio.AsyncServer` class.
+    Adds the validation and AsyncAPI generation of :class:`AsyncAPISocketIO` for
+    asyncio servers, e.g. served by uvicorn through :class:`socketio.ASGIApp`.
+
+    Handlers receive the client sid first and the payload second, as with any
+    ``socketio.AsyncServer`` handler, and may be coroutines.
+
+    Example::
+        sio = AsyncAPIAsyncServer(async_mode="asgi", validate=True)
+        app = socketio.ASGIApp(sio)
+
+        class UserModel(BaseModel):
+            name: str
+            id: int
+
+        @sio.on("get_user", response_model=UserModel)
+        async def get_user(sid, data):
+            return {"name": "Bob", "id": 123}
+    """
+
+    _request_arg_index = 1
+
+    def __init__(self, *args, **kwargs):
+        """Create AsyncAPIAsyncServer
+
+        The AsyncAPI and validation keyword arguments are documented in
+        :meth:`sio_asyncapi.base.AsyncAPIBase.__init__`, the remaining ones are passed
+        to :class:`socketio.AsyncServer`.
+        """
+        super().__init__(*args, **kwargs)
+
+    async def emit(
+        self,
+        event: str,
+        data=None,
+        to=None,
+        room=None,
+        skip_sid=None,
+        namespace=None,
+        callback=None,
+        **kwargs,
+    ):
+        """
+        Overrides emit in order to validate data with pydantic models
+
+        Per-sid validation policies count the emit for the client whose event is
+        being handled, as with :class:`AsyncAPISocketIO`; emits made outside of an
+        event handler have no sid and share one count.
+
+        for more info refer to :meth:`socketio.AsyncServer.emit`
+        """
+        (data,) = self._prepare_emit_args(
+            event,
+            normalize_namespace(namespace),
+            (data,),
+            _serving_sid.get,
+        )
+        return await super().emit(
+            event,
+            data,
+            to=to,
+            room=room,
+            skip_sid=skip_sid,
+            namespace=namespace,
+            callback=callback,
+            **kwargs,
+        )
+
+    def on(
+        self,
+        event,
+        handler: Optional[Callable] = None,
+        namespace=None,
+        *,
+        get_from_typehint: bool = False,
+        response_model: Optional[Union[ModelType, NotProvidedType]] = None,
+        request_model: Optional[Union[ModelType, NotProvidedType]] = None,
+        validation_policy: Optional[ValidationPolicy] = None,
+        validation_offload: Optional[ValidationOffload] = None,
+        track_allocations: bool = False,
+    ):
+        """Register a SocketIO event handler with additional functionalities
+
+        Can be used as a decorator or called with the handler, like
+        :meth:`socketio.AsyncServer.on`.
+
+        Args:
+            event (str): refer to AsyncServer.on(event)
+            handler (Optional[Callable], optional): refer to AsyncServer.on(handler).
+                Defaults to None.
+            namespace (str, optional): refer to AsyncServer.on(namespace). Defaults to None.
+            get_from_typehint (bool, optional): Get request and response models from the
+                typehints of the second (payload) argument and the return value.
+                Defaults to False.
+            response_model (Optional[ModelType], optional): Acknowledge model used
+                for validation and documentation. Defaults to None.
+            request_model (Optional[ModelType], optional): Request payload model used
+                for validation and documentation. Defaults to None.
+            validation_policy (Optional[ValidationPolicy], optional): Policy deciding which
+                events are validated. Defaults to None.
+            validation_offload (Optional[ValidationOffload], optional): Executor offload
+                for the validation of large payloads of this event. Defaults to None.
+            track_allocations (bool, optional): If True the peak and net memory allocated
+                by the validation, handler and serialization of this event are recorded
+                in ``allocation_tracker`` (and ``metrics``). Defaults to False.
+        """
+        decorator = self._on_decorator(
+            event,
+            namespace,
+            get_from_typehint=get_from_typehint,
+            response_model=response_model,
+            request_model=request_model,
+            validation_policy=validation_policy,
+            validation_offload=validation_offload,
+            track_allocations=track_allocations,
+        )
+        if handler is None:
+            return decorator
+        decorator(handler)
+
+    def _register_handler(self, message: str, namespace: Optional[str], handler: Callable) -> None:
+        if inspect.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def serving_async(*args, **kwargs):
+                token = _serving_sid.set(args[0] if args else None)
+                try:
+                    return await handler(*args, **kwargs)
+                finally:
+                    _serving_sid.reset(token)
+
+            super().on(message, serving_async, namespace=namespace)
+            return
+
+        @functools.wraps(handler)
+        def serving(*args, **kwargs):
+            token = _serving_sid.set(args[0] if args else None)
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                _serving_sid.reset(token)
+
+        super().on(message, serving, namespace=namespace)
+
+    def _event_sid(self, args: tuple) -> Optional[str]:
+        return args[0] if args else None
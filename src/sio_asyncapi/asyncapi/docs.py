@@ -1,18 +1,24 @@
 """AsyncAPI 3.1 documentation generation for Socket.IO servers."""
+import atexit
 import copy
+import hashlib
 import json
 import re
 import textwrap
+import threading
+from types import MappingProxyType
 from urllib.parse import urlsplit
-from typing import Any, Callable, Dict, Literal, Optional, Type, Union
+from typing import IO, Any, Callable, Dict, Iterator, Literal, Mapping, Optional, Type, Union
 
-import yaml
 from loguru import logger
-from sio_asyncapi._pydantic import BaseModel
 
-from sio_asyncapi._compat import is_pydantic_model_type, model_schema
+from sio_asyncapi._compat import ModelType, is_model_type, referenced_classes
 
-from .utils import add_ref_prepath
+from .export import dump_yaml, iter_json, iter_yaml
+from .resolver import RefResolver
+from .schema_cache import prefixed_schema
+from .snapshot import SpecSnapshot, model_fingerprint
+from .utils import map_refs
 
 NotProvidedType = Literal["NotProvided"]
 
@@ -32,7 +38,15 @@ DEFAULT_COMPONENTS = {
 
 
 class AsyncAPIDoc:
-    """AsyncAPI 3.1 documentation generator."""
+    """AsyncAPI 3.1 documentation generator.
+
+    The dict, JSON and YAML exports are memoized until the next mutation. Mutations
+    through the ``add_new_*``/``ensure_channel`` methods bump ``generation``; call
+    :meth:`invalidate` after changing the document attributes directly.
+
+    The agent catalog is maintained per operation: a mutation only rebuilds the
+    entries of the operations it adds and of those depending on a replaced component.
+    """
 
     def __init__(
         self,
@@ -43,6 +57,8 @@ class AsyncAPIDoc:
         channels: Dict[str, Any],
         operations: Dict[str, Any],
         components: Dict[str, Any],
+        snapshot: Optional[SpecSnapshot] = None,
+        hoist_definitions: bool = False,
     ) -> None:
         self.asyncapi = asyncapi
         self.info = info
@@ -50,6 +66,49 @@ class AsyncAPIDoc:
         self.channels = channels
         self.operations = operations
         self.components = components
+        self.generation = 0
+        self._cache: Dict[Any, Any] = {}
+        self._catalog_lock = threading.Lock()
+        self._catalog: Optional[Dict[str, Dict[str, Any]]] = None
+        self._catalog_dependencies: Dict[str, set[str]] = {}
+        self._changed_components: set[str] = set()
+        self._changed_operations: set[str] = set()
+        self.snapshot = snapshot
+        if snapshot is not None:
+            atexit.register(self.save_snapshot)
+        # Registrations hashed to key the snapshot document, None once one cannot be hashed.
+        self._registrations: Optional[list[str]] = []
+        self.hoist_definitions = hoist_definitions
+        self._schema_owners = self._unknown_schema_owners()
+
+    def invalidate(self) -> None:
+        """Bump the document generation and drop the memoized exports and agent catalog."""
+        with self._catalog_lock:
+            self._catalog = None
+        self._bump_generation()
+
+    def _bump_generation(self) -> None:
+        self.generation += 1
+        # Replace rather than clear, so exports built concurrently land in the stale dict.
+        self._cache = {}
+
+    def _changed(self, *components: str, operation: Optional[str] = None) -> None:
+        """Record a mutation of components (see :func:`component_key`) or of an operation."""
+        with self._catalog_lock:
+            self._changed_components.update(components)
+            if operation is not None:
+                self._changed_operations.add(operation)
+        self._bump_generation()
+
+    def _cached(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Return the export memoized under ``key`` for the current generation."""
+        cache = self._cache
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        value = cache[key] = build()
+        return value
 
     @staticmethod
     def normalize_namespace(namespace: Optional[str]) -> str:
@@ -123,6 +182,8 @@ class AsyncAPIDoc:
         server_url: str = "http://localhost:5000",
         server_name: str = "BACKEND",
         server_protocol: str = "socketio",
+        snapshot: Optional[SpecSnapshot] = None,
+        hoist_definitions: bool = False,
     ) -> "AsyncAPIDoc":
         """Initialize AsyncAPI documentation generator."""
         logger.info(f"{server_url=}, {server_name=}, {server_protocol=}")
@@ -146,10 +207,28 @@ class AsyncAPIDoc:
             channels={},
             operations={},
             components=copy.deepcopy(DEFAULT_COMPONENTS),
+            snapshot=snapshot,
+            hoist_definitions=hoist_definitions,
         )
 
     def dict(self, **_: Any) -> Dict[str, Any]:
-        """Return the AsyncAPI document as a plain dict."""
+        """Return the AsyncAPI document as a plain dict, a copy the caller may modify."""
+        return copy.deepcopy(self._document())
+
+    def document_view(self) -> Mapping[str, Any]:
+        """Return a read-only view of the AsyncAPI document without copying it per call.
+
+        The view is frozen once per document generation: mappings are
+        ``MappingProxyType`` and lists are tuples, so repeated reads of an unchanged
+        document cost nothing. Use :meth:`dict` for a copy to modify or serialize.
+        """
+        return self._cached("document_view", lambda: _freeze(self._document()))
+
+    def _document(self) -> Dict[str, Any]:
+        """Return the document memoized until the next mutation; only read by the exports."""
+        return self._cached("dict", self._build_dict)
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "asyncapi": self.asyncapi,
             "info": copy.deepcopy(self.info),
@@ -159,14 +238,182 @@ class AsyncAPIDoc:
             "components": copy.deepcopy(self.components),
         }
 
+    def registration_hash(self) -> Optional[str]:
+        """Return a hash of the document settings and of the registered events and models.
+
+        Only tracked with a snapshot; None when a registered model cannot be fingerprinted.
+        """
+        if self.snapshot is None or self._registrations is None:
+            return None
+        digest = hashlib.sha256(
+            json.dumps(
+                [self.asyncapi, self.info, self.servers, self.hoist_definitions],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        for registration in self._registrations:
+            digest.update(registration.encode())
+        return digest.hexdigest()
+
+    def _record_registration(self, *fields: Any, models: tuple[Any, ...]) -> None:
+        """Add a registration to :meth:`registration_hash`."""
+        if self.snapshot is None or self._registrations is None:
+            return
+        model_keys = []
+        for model in models:
+            if is_model_type(model):
+                model_key = model_fingerprint(model)
+                if model_key is None:
+                    self._registrations = None
+                    return
+            else:
+                model_key = getattr(model, "__qualname__", repr(model))
+            model_keys.append(model_key)
+        self._registrations.append(json.dumps([*fields, *model_keys]))
+
+    @classmethod
+    def _receiver_fields(
+        cls,
+        handler: Callable,
+        name: str,
+        message_name: Optional[str] = None,
+        namespace: Optional[str] = None,
+    ) -> tuple[str, ...]:
+        """Return the fields of a receiver registration hashed by :meth:`registration_hash`."""
+        normalized_namespace = cls.normalize_namespace(namespace)
+        message_component = message_name or cls.message_component_name(
+            name,
+            normalized_namespace,
+            title_case=True,
+        )
+        description = cls._clean_description(handler.__doc__)
+        return ("receive", name, normalized_namespace, message_component, description)
+
+    @classmethod
+    def _sender_fields(
+        cls,
+        event: str,
+        description: Optional[str] = None,
+        namespace: Optional[str] = None,
+    ) -> tuple[str, ...]:
+        """Return the fields of a sender registration hashed by :meth:`registration_hash`."""
+        normalized_namespace = cls.normalize_namespace(namespace)
+        message_component = cls.message_component_name(
+            event,
+            normalized_namespace,
+            title_case=False,
+        )
+        return ("send", event, normalized_namespace, message_component, cls._clean_description(description))
+
+    def add_registrations(self, registrations: list[tuple[str, Dict[str, Any]]]) -> None:
+        """Apply recorded ``add_new_receiver``/``add_new_sender`` calls.
+
+        With a snapshot holding the document of the same registrations, the channels,
+        operations and components are restored from it instead of being generated.
+
+        Args:
+            registrations (list[tuple[str, Dict[str, Any]]]): ("add_new_receiver" or
+                "add_new_sender", keyword arguments) pairs, in registration order
+        """
+        if self.snapshot is not None and self._restore_snapshot(self.snapshot, registrations):
+            return
+        for method, kwargs in registrations:
+            getattr(self, method)(**kwargs)
+
+    def _restore_snapshot(
+        self, snapshot: SpecSnapshot, registrations: list[tuple[str, Dict[str, Any]]]
+    ) -> bool:
+        for method, kwargs in registrations:
+            if method == "add_new_receiver":
+                fields = self._receiver_fields(
+                    kwargs["handler"],
+                    kwargs["name"],
+                    kwargs.get("message_name"),
+                    kwargs.get("namespace"),
+                )
+                models = (kwargs.get("payload_model"), kwargs.get("ack_data_model"))
+            else:
+                fields = self._sender_fields(
+                    kwargs["event"],
+                    kwargs.get("description"),
+                    kwargs.get("namespace"),
+                )
+                models = (kwargs.get("payload_model"),)
+            self._record_registration(*fields, models=models)
+
+        registration_hash = self.registration_hash()
+        content = snapshot.document(registration_hash) if registration_hash else None
+        if content is None:
+            self._registrations = []
+            return False
+        self.channels = content["channels"]
+        self.operations = content["operations"]
+        self.components = content["components"]
+        self._schema_owners = self._unknown_schema_owners()
+        self.invalidate()
+        return True
+
+    def save_snapshot(self, document: Optional[Dict[str, Any]] = None) -> None:
+        """Record the document in the snapshot, if any, and write the snapshot file.
+
+        Called by ``materialize_docs`` and at interpreter exit; exporting the
+        document never writes the file.
+        """
+        if self.snapshot is None:
+            return
+        registration_hash = self.registration_hash()
+        if registration_hash is not None:
+            self.snapshot.store_document(registration_hash, document or self._document())
+        self.snapshot.save()
+
     def json(self, **kwargs: Any) -> str:
         """Return the AsyncAPI document as JSON."""
         json_kwargs = {key: value for key, value in kwargs.items() if key not in {"by_alias", "exclude_none"}}
-        return json.dumps(self.dict(), **json_kwargs)
+        try:
+            key = ("json", frozenset(json_kwargs.items()))
+        except TypeError:
+            return json.dumps(self._document(), **json_kwargs)
+        return self._cached(key, lambda: json.dumps(self._document(), **json_kwargs))
 
     def get_yaml(self) -> str:
         """Return AsyncAPI documentation in YAML format."""
-        return yaml.safe_dump(self.dict(), sort_keys=False)
+        return self._cached("yaml", lambda: dump_yaml(self._document()))
+
+    def _sections(self) -> Iterator[tuple[str, Any]]:
+        """Yield the top-level sections of the live document, without copying them."""
+        yield "asyncapi", self.asyncapi
+        yield "info", self.info
+        yield "servers", self.servers
+        yield "channels", self.channels
+        yield "operations", self.operations
+        yield "components", self.components
+
+    def write_yaml(self, stream: IO[str]) -> None:
+        """Write the AsyncAPI document to a text stream in YAML format.
+
+        Unlike :meth:`get_yaml`, the document is neither copied nor encoded as a
+        whole: channels, operations and components are written one at a time, so
+        peak memory stays flat for very large applications.
+
+        Args:
+            stream (IO[str]): file, socket file (``socket.makefile("w")``) or any
+                object with a ``write(str)`` method
+        """
+        for chunk in iter_yaml(self._sections()):
+            stream.write(chunk)
+
+    def write_json(self, stream: IO[str]) -> None:
+        """Write the AsyncAPI document to a text stream in JSON format.
+
+        The output is the same as :meth:`json` without arguments, written one
+        channel, operation and component at a time like :meth:`write_yaml`.
+
+        Args:
+            stream (IO[str]): file, socket file or any object with a ``write(str)`` method
+        """
+        for chunk in iter_json(self._sections()):
+            stream.write(chunk)
 
     def ensure_channel(self, namespace: Optional[str]) -> str:
         """Ensure the namespace channel exists and return its identifier."""
@@ -177,24 +424,113 @@ class AsyncAPIDoc:
                 "address": normalized_namespace,
                 "messages": {},
             }
+            self._bump_generation()
         return channel_name
 
     def _schema_ref(
         self,
-        model: Optional[Union[Type[BaseModel], NotProvidedType]],
+        model: Optional[Union[ModelType, NotProvidedType]],
     ) -> Optional[Dict[str, str]]:
         """Create or fetch a schema reference for a payload or reply."""
         if model == "NotProvided":
             return {"$ref": "#/components/schemas/NoSpec"}
-        if not is_pydantic_model_type(model):
+        if not isinstance(model, type) or not is_model_type(model):
             return None
 
-        schema_name = model.__name__
-        schema = model_schema(model)
-        add_ref_prepath(schema, f"/components/schemas/{schema_name}")
-        self.components["schemas"][schema_name] = schema
+        if self.hoist_definitions:
+            return self._hoisted_schema_ref(model)
+
+        schema_name = self._schema_component_name(model.__name__, _model_key(model), model)
+        schema = prefixed_schema(model, f"/components/schemas/{schema_name}", self.snapshot)
+        self._store_schema(schema_name, schema)
+        return {"$ref": f"#/components/schemas/{schema_name}"}
+
+    def _hoisted_schema_ref(self, model: Type[Any]) -> Dict[str, str]:
+        """Store a model schema with its nested definitions lifted into ``components/schemas``.
+
+        Definitions shared by several models are stored once; refs to them are rewritten
+        to point at their component.
+        """
+        schema = prefixed_schema(model, "", self.snapshot)
+        definitions_key = "definitions" if "definitions" in schema else "$defs"
+        definitions = schema.get(definitions_key) or {}
+        try:
+            classes = {}
+            for cls in referenced_classes(model):
+                classes.setdefault(cls.__name__, []).append(cls)
+        except Exception:  # noqa: BLE001 - unresolvable annotations, match by content only
+            classes = {}
+
+        names = {}
+        for definition_name, definition in definitions.items():
+            candidates = classes.get(definition_name, [])
+            if len(candidates) == 1:
+                owner, definition_model = _model_key(candidates[0]), candidates[0]
+            else:
+                owner, definition_model = json.dumps(definition, sort_keys=True), None
+            names[definition_name] = self._schema_component_name(definition_name, owner, definition_model)
+        schema_name = self._schema_component_name(model.__name__, _model_key(model), model)
+
+        local_prefix = f"#/{definitions_key}/"
+
+        def rewrite(ref: str) -> str:
+            if ref.startswith(local_prefix) and ref[len(local_prefix):] in names:
+                return f"#/components/schemas/{names[ref[len(local_prefix):]]}"
+            return ref
+
+        for definition_name, definition in definitions.items():
+            self._store_schema(names[definition_name], map_refs(definition, rewrite))
+        self._store_schema(
+            schema_name,
+            map_refs({key: value for key, value in schema.items() if key != definitions_key}, rewrite),
+        )
         return {"$ref": f"#/components/schemas/{schema_name}"}
 
+    def _unknown_schema_owners(self) -> Dict[str, Optional[str]]:
+        """Owners of schemas not stored by :meth:`_store_schema`; None is claimed by the first model."""
+        return {
+            name: "NoSpec" if name == "NoSpec" else None
+            for name in self.components["schemas"]
+        }
+
+    def _schema_component_name(
+        self,
+        name: str,
+        owner: str,
+        model: Optional[Type[Any]] = None,
+    ) -> str:
+        """Return the schema component name of ``owner``, unique within the document.
+
+        ``name`` is used unless another owner has it; then the qualified name of the
+        model, its module-qualified name or a numbered name.
+        """
+        candidates = [name]
+        if model is not None:
+            candidates.append(model.__qualname__)
+            candidates.append(f"{model.__module__}.{model.__qualname__}")
+        for candidate in candidates:
+            candidate = re.sub(r"[^a-zA-Z0-9.\-_]+", "_", candidate)
+            if self._schema_owners.get(candidate, owner) in (owner, None):
+                self._schema_owners[candidate] = owner
+                return candidate
+        index = 2
+        while self._schema_owners.get(f"{name}_{index}", owner) not in (owner, None):
+            index += 1
+        self._schema_owners[f"{name}_{index}"] = owner
+        return f"{name}_{index}"
+
+    def _store_schema(self, name: str, schema: Dict[str, Any]) -> None:
+        """Store a copy of a schema component, recording a change only if it differs.
+
+        Schemas come from the process-wide cache, shared with every other document,
+        so the copy keeps direct edits of ``components`` local to this one.
+        """
+        schemas = self.components["schemas"]
+        existing = schemas.get(name)
+        if existing != schema:
+            schemas[name] = copy.deepcopy(schema)
+            self._changed(f"components/schemas/{name}")
+
     def _store_message(
         self,
         *,
@@ -216,6 +552,10 @@ class AsyncAPIDoc:
         self.channels[channel_name]["messages"][message_component] = {
             "$ref": f"#/components/messages/{message_component}"
         }
+        self._changed(
+            f"components/messages/{message_component}",
+            f"channels/{channel_name}/messages/{message_component}",
+        )
         return f"#/channels/{channel_name}/messages/{message_component}"
 
     def add_new_receiver(
@@ -223,8 +563,8 @@ class AsyncAPIDoc:
         handler: Callable,
         name: str,
         message_name: Optional[str] = None,
-        ack_data_model: Optional[Union[Type[BaseModel], NotProvidedType]] = None,
-        payload_model: Optional[Union[Type[BaseModel], NotProvidedType]] = None,
+        ack_data_model: Optional[Union[ModelType, NotProvidedType]] = None,
+        payload_model: Optional[Union[ModelType, NotProvidedType]] = None,
         namespace: Optional[str] = None,
     ) -> None:
         """Register a client-to-server Socket.IO event as an AsyncAPI receive operation."""
@@ -236,6 +576,10 @@ class AsyncAPIDoc:
             title_case=True,
         )
         description = self._clean_description(handler.__doc__)
+        self._record_registration(
+            *self._receiver_fields(handler, name, message_name, namespace),
+            models=(payload_model, ack_data_model),
+        )
         payload_ref = self._schema_ref(payload_model)
         message = {
             "name": name,
@@ -267,11 +611,16 @@ class AsyncAPIDoc:
             operation["description"] = description
 
         self.operations[operation_name] = operation
+        self._changed(
+            f"components/messages/{message_component}",
+            f"channels/{channel_name}/messages/{message_component}",
+            operation=operation_name,
+        )
 
     def add_new_sender(
         self,
         event: str,
-        payload_model: Optional[Union[Type[BaseModel], NotProvidedType]] = None,
+        payload_model: Optional[Union[ModelType, NotProvidedType]] = None,
         description: Optional[str] = None,
         namespace: Optional[str] = None,
     ) -> None:
@@ -284,6 +633,10 @@ class AsyncAPIDoc:
             title_case=False,
         )
         clean_description = self._clean_description(description)
+        self._record_registration(
+            *self._sender_fields(event, description, namespace),
+            models=(payload_model,),
+        )
         payload_ref = self._schema_ref(payload_model)
         message_ref = self._store_message(
             channel_name=channel_name,
@@ -307,111 +660,187 @@ class AsyncAPIDoc:
             operation["description"] = clean_description
 
         self.operations[operation_name] = operation
-
-    def _lookup_ref(self, ref: str, doc_dict: Dict[str, Any]) -> Any:
-        """Resolve a local AsyncAPI ref against the document dict."""
-        if not ref.startswith("#/"):
-            return None
-
-        current: Any = doc_dict
-        for part in ref[2:].split("/"):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return copy.deepcopy(current)
-
-    def _resolve_refs(
-        self,
-        node: Any,
-        doc_dict: Dict[str, Any],
-        *,
-        seen: Optional[set[str]] = None,
-    ) -> Any:
-        """Resolve local refs inside a schema or AsyncAPI node recursively."""
-        if seen is None:
-            seen = set()
-
-        if isinstance(node, list):
-            return [self._resolve_refs(item, doc_dict, seen=seen.copy()) for item in node]
-
-        if not isinstance(node, dict):
-            return node
-
-        if "$ref" in node and isinstance(node["$ref"], str):
-            ref = node["$ref"]
-            resolved_target = self._lookup_ref(ref, doc_dict)
-            extra_fields = {
-                key: self._resolve_refs(value, doc_dict, seen=seen.copy())
-                for key, value in node.items()
-                if key != "$ref"
-            }
-            if resolved_target is None or ref in seen:
-                return {"$ref": ref, **extra_fields}
-
-            resolved_node = self._resolve_refs(
-                resolved_target,
-                doc_dict,
-                seen=seen | {ref},
-            )
-            if isinstance(resolved_node, dict):
-                merged = {**resolved_node, **extra_fields}
-                merged.setdefault("x-component-ref", ref)
-                return merged
-            return {"$ref": ref, **extra_fields}
-
-        return {
-            key: self._resolve_refs(value, doc_dict, seen=seen.copy())
-            for key, value in node.items()
-        }
+        self._changed(operation=operation_name)
 
     def get_agent_schema(self) -> Dict[str, Any]:
-        """Return a compact agent-friendly event catalog derived from AsyncAPI 3.1."""
-        doc_dict = self.dict()
-        events: list[Dict[str, Any]] = []
-
-        for operation_id in sorted(doc_dict["operations"]):
-            operation = doc_dict["operations"][operation_id]
-            channel = self._resolve_refs(operation["channel"], doc_dict)
-            namespace = channel.get("address", "/")
-            direction = "client_to_server" if operation["action"] == "receive" else "server_to_client"
-            message_ref = operation["messages"][0]["$ref"]
-            message_component = message_ref.rsplit("/", 1)[-1]
-            message = self._resolve_refs({"$ref": message_ref}, doc_dict)
-
-            event = {
-                "name": message.get("name", message_component),
-                "namespace": namespace,
-                "direction": direction,
-                "operation_id": operation_id,
-                "message_component": message_component,
-                "description": message.get("description") or operation.get("description", ""),
-            }
+        """Return a compact agent-friendly event catalog derived from AsyncAPI 3.1, a copy
+        the caller may modify."""
+        return copy.deepcopy(self._agent_schema())
 
-            payload = message.get("payload")
-            if payload is not None:
-                schema_key = "input_schema" if direction == "client_to_server" else "output_schema"
-                event[schema_key] = self._resolve_refs(payload, doc_dict)
-                if isinstance(payload, dict) and payload.get("x-component-ref"):
-                    event[f"{schema_key}_component"] = payload["x-component-ref"].rsplit("/", 1)[-1]
+    def agent_schema_view(self) -> Mapping[str, Any]:
+        """Return a read-only view of the agent event catalog without copying it per call.
 
-            if direction == "client_to_server":
-                ack_schema = message.get("x-ack")
-                if ack_schema is not None:
-                    event["ack_schema"] = self._resolve_refs(ack_schema, doc_dict)
-                    if isinstance(event["ack_schema"], dict) and event["ack_schema"].get("x-component-ref"):
-                        event["ack_schema_component"] = event["ack_schema"]["x-component-ref"].rsplit("/", 1)[-1]
+        Frozen like :meth:`document_view`; use :meth:`get_agent_schema` for a copy
+        to modify or serialize.
+        """
+        return self._cached("agent_schema_view", lambda: _freeze(self._agent_schema()))
 
-            events.append(event)
+    def _agent_schema(self) -> Dict[str, Any]:
+        """Return the catalog memoized until the next mutation; only read by the exports."""
+        return self._cached("agent_schema", self._build_agent_schema)
 
+    def get_agent_schema_json(self) -> str:
+        """Return the compact agent-friendly event catalog as JSON."""
+        return self._cached(
+            "agent_schema_json",
+            lambda: json.dumps(self._agent_schema(), indent=2, sort_keys=True),
+        )
+
+    def _build_agent_schema(self) -> Dict[str, Any]:
+        catalog = self._refresh_catalog()
         return {
             "format": "sio-asyncapi-agent-schema",
             "version": "1.0",
-            "asyncapi_version": doc_dict["asyncapi"],
-            "info": doc_dict["info"],
-            "servers": doc_dict["servers"],
-            "events": events,
+            "asyncapi_version": self.asyncapi,
+            "info": copy.deepcopy(self.info),
+            "servers": copy.deepcopy(self.servers),
+            "events": [catalog[operation_id] for operation_id in sorted(catalog)],
         }
 
-    def get_agent_schema_json(self) -> str:
-        """Return the compact agent-friendly event catalog as JSON."""
-        return json.dumps(self.get_agent_schema(), indent=2, sort_keys=True)
+    def _refresh_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """Rebuild the catalog entries of new operations and of those using changed components."""
+        with self._catalog_lock:
+            if self._catalog is None:
+                self._catalog = {}
+                self._catalog_dependencies = {}
+                stale = set(self.operations)
+            else:
+                changed = self._changed_components
+                stale = self._changed_operations | {
+                    operation_id
+                    for operation_id, dependencies in self._catalog_dependencies.items()
+                    if not dependencies.isdisjoint(changed)
+                }
+            self._changed_components = set()
+            self._changed_operations = set()
+
+            # The live document is only read; resolved entries never alias it.
+            resolver = RefResolver({
+                "channels": self.channels,
+                "operations": self.operations,
+                "components": self.components,
+            })
+            direct_refs: Dict[str, set[str]] = {}
+            for operation_id in stale:
+                operation = self.operations.get(operation_id)
+                if operation is None:
+                    self._catalog.pop(operation_id, None)
+                    self._catalog_dependencies.pop(operation_id, None)
+                    continue
+                self._catalog[operation_id] = self._catalog_entry(operation_id, operation, resolver)
+                self._catalog_dependencies[operation_id] = self._dependencies(
+                    operation,
+                    resolver,
+                    direct_refs,
+                )
+            return dict(self._catalog)
+
+    @staticmethod
+    def _dependencies(
+        operation: Dict[str, Any],
+        resolver: RefResolver,
+        direct_refs: Dict[str, set[str]],
+    ) -> set[str]:
+        """Return the keys of the components an operation's catalog entry is built from.
+
+        ``direct_refs`` memoizes the component keys referenced by each component.
+        """
+        dependencies: set[str] = set()
+        pending = list(_referenced_components(operation["messages"]))
+        while pending:
+            key = pending.pop()
+            if key in dependencies:
+                continue
+            dependencies.add(key)
+            if key not in direct_refs:
+                direct_refs[key] = _referenced_components(resolver.lookup(f"#/{key}"))
+            pending.extend(direct_refs[key])
+        return dependencies
+
+    @staticmethod
+    def _catalog_entry(
+        operation_id: str,
+        operation: Dict[str, Any],
+        resolver: RefResolver,
+    ) -> Dict[str, Any]:
+        """Build the agent catalog entry of an operation."""
+        resolve = resolver.resolve
+        channel = resolver.lookup(operation["channel"]["$ref"]) or {}
+        namespace = channel.get("address", "/")
+        direction = "client_to_server" if operation["action"] == "receive" else "server_to_client"
+        message_ref = operation["messages"][0]["$ref"]
+        message_component = message_ref.rsplit("/", 1)[-1]
+        message = resolve({"$ref": message_ref})
+
+        event = {
+            "name": message.get("name", message_component),
+            "namespace": namespace,
+            "direction": direction,
+            "operation_id": operation_id,
+            "message_component": message_component,
+            "description": message.get("description") or operation.get("description", ""),
+        }
+
+        payload = message.get("payload")
+        if payload is not None:
+            schema_key = "input_schema" if direction == "client_to_server" else "output_schema"
+            event[schema_key] = resolve(payload)
+            if isinstance(payload, dict) and payload.get("x-component-ref"):
+                event[f"{schema_key}_component"] = payload["x-component-ref"].rsplit("/", 1)[-1]
+
+        if direction == "client_to_server":
+            ack_schema = message.get("x-ack")
+            if ack_schema is not None:
+                event["ack_schema"] = resolve(ack_schema)
+                if isinstance(event["ack_schema"], dict) and event["ack_schema"].get("x-component-ref"):
+                    event["ack_schema_component"] = event["ack_schema"]["x-component-ref"].rsplit("/", 1)[-1]
+
+        return event
+
+
+def _freeze(node: Any) -> Any:
+    """Return a read-only copy of a JSON-like node: mappings as proxies, lists as tuples."""
+    if isinstance(node, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze(value) for value in node)
+    return node
+
+
+def _model_key(model: Type[Any]) -> str:
+    """Return the module-qualified name identifying a model across registrations."""
+    return f"{model.__module__}.{model.__qualname__}"
+
+
+def _referenced_components(node: Any) -> set[str]:
+    """Return the component keys of the local refs found in a node."""
+    keys: set[str] = set()
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                key = component_key(ref)
+                if key is not None:
+                    keys.add(key)
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return keys
+
+
+def component_key(ref: str) -> Optional[str]:
+    """Return the key of the replaceable document part a local ref points into.
+
+    ``#/components/schemas/Model/$defs/Data`` belongs to ``components/schemas/Model``
+    and ``#/channels/root/messages/Event`` to ``channels/root/messages/Event``.
+    """
+    if not ref.startswith("#/"):
+        return None
+    parts = ref[2:].split("/")
+    if parts[0] == "components" and len(parts) >= 3:
+        return "/".join(parts[:3])
+    if parts[0] == "channels" and len(parts) >= 4:
+        return "/".join(parts[:4])
+    return None
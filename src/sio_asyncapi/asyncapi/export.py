@@ -0,0 +1,72 @@
+"""Incremental YAML and JSON encoding of AsyncAPI documents."""
+import json
+from typing import Any, Iterable, Iterator, Tuple
+
+import yaml
+
+# libyaml's dumper is several times faster than the pure Python one
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Nesting depth down to which the large sections are written entry by entry:
+# channels per message (a namespace channel lists every event), operations per
+# entry, components per message and schema.
+STREAMED_DEPTHS = {"channels": 3, "operations": 1, "components": 2}
+
+
+def dump_yaml(value: Any) -> str:
+    """Return ``value`` as block style YAML, keeping the order of the mappings."""
+    return yaml.dump(value, Dumper=YAML_DUMPER, sort_keys=False)
+
+
+def _indent(text: str, level: int) -> str:
+    prefix = "  " * level
+    return "".join(f"{prefix}{line}" if line.strip() else line for line in text.splitlines(keepends=True))
+
+
+def _yaml_chunks(key: Any, value: Any, depth: int, level: int) -> Iterator[str]:
+    if depth == 0 or not isinstance(value, dict) or not value:
+        yield _indent(dump_yaml({key: value}), level)
+        return
+    # a mapping key alone dumps as "key\n...\n" or "key\n"
+    yield _indent(f"{dump_yaml(key).splitlines()[0]}:\n", level)
+    for entry_key, entry in value.items():
+        yield from _yaml_chunks(entry_key, entry, depth - 1, level + 1)
+
+
+def _json_chunks(key: Any, value: Any, depth: int, encode) -> Iterator[str]:
+    if depth == 0 or not isinstance(value, dict) or not value:
+        yield f"{encode(key)}: {encode(value)}"
+        return
+    yield f"{encode(key)}: {{"
+    separator = ""
+    for entry_key, entry in value.items():
+        yield separator
+        separator = ", "
+        yield from _json_chunks(entry_key, entry, depth - 1, encode)
+    yield "}"
+
+
+def iter_yaml(sections: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    """Yield the YAML document of ``(key, value)`` sections in chunks.
+
+    Channels, operations and components are encoded one entry at a time, so the
+    memory used does not grow with the size of the document.
+    """
+    for key, value in sections:
+        yield from _yaml_chunks(key, value, STREAMED_DEPTHS.get(key, 0), 0)
+
+
+def iter_json(sections: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    """Yield the JSON document of ``(key, value)`` sections in chunks.
+
+    The output is the same as ``json.dumps`` of the whole document, encoded one
+    channel, operation or component at a time.
+    """
+    encode = json.JSONEncoder().encode
+    yield "{"
+    separator = ""
+    for key, value in sections:
+        yield separator
+        separator = ", "
+        yield from _json_chunks(key, value, STREAMED_DEPTHS.get(key, 0), encode)
+    yield "}"
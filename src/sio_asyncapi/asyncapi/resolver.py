@@ -0,0 +1,88 @@
+"""Resolution of local ``$ref``s in AsyncAPI documents."""
+from typing import Any, Dict, Optional
+
+
+class RefResolver:
+    """Inline the local ``$ref``s of a document, resolving each component once.
+
+    Resolved components are cached and the same objects are returned for every
+    reference to them, so results must be treated as read-only. A ``$ref`` met
+    again while its own target is being resolved is left as is; a cached component
+    is inlined as resolved on its own wherever it is referenced. Components whose
+    resolution stopped at a cycle through one of their referrers are not cached.
+    """
+
+    def __init__(self, document: Dict[str, Any]) -> None:
+        self.document = document
+        self._resolved: Dict[str, Dict[str, Any]] = {}
+        # ids of cached results without any ref left to resolve; kept alive by _resolved
+        self._complete: set[int] = set()
+
+    def lookup(self, ref: str) -> Any:
+        """Return the node a local ref points to, None if it does not exist."""
+        if not ref.startswith("#/"):
+            return None
+
+        current: Any = self.document
+        for part in ref[2:].split("/"):
+            if not isinstance(current, dict) or part not in current:
+                return None
+            current = current[part]
+        return current
+
+    def resolve(self, node: Any) -> Any:
+        """Return ``node`` with its local refs inlined and tagged with ``x-component-ref``."""
+        return self._resolve(node, set(), set())
+
+    def _resolve(self, node: Any, in_progress: set, cuts: set) -> Any:
+        if isinstance(node, list):
+            return [self._resolve(item, in_progress, cuts) for item in node]
+
+        if not isinstance(node, dict) or id(node) in self._complete:
+            return node
+
+        ref = node.get("$ref")
+        if not isinstance(ref, str):
+            return {key: self._resolve(value, in_progress, cuts) for key, value in node.items()}
+
+        extra_fields = {
+            key: self._resolve(value, in_progress, cuts)
+            for key, value in node.items()
+            if key != "$ref"
+        }
+        resolved = self._resolve_ref(ref, in_progress, cuts)
+        if resolved is None:
+            return {"$ref": ref, **extra_fields}
+        if not extra_fields:
+            return resolved
+        return {**resolved, **extra_fields}
+
+    def _resolve_ref(self, ref: str, in_progress: set, cuts: set) -> Optional[Dict[str, Any]]:
+        if ref in in_progress:
+            cuts.add(ref)
+            return None
+        resolved = self._resolved.get(ref)
+        if resolved is not None:
+            return resolved
+        target = self.lookup(ref)
+        if target is None:
+            return None
+
+        target_cuts: set = set()
+        in_progress.add(ref)
+        try:
+            resolved = self._resolve(target, in_progress, target_cuts)
+        finally:
+            in_progress.discard(ref)
+        complete = not target_cuts
+        target_cuts.discard(ref)
+        cuts.update(target_cuts)
+        if not isinstance(resolved, dict):
+            return None
+        if "x-component-ref" not in resolved:
+            resolved = {**resolved, "x-component-ref": ref}
+        if not target_cuts:
+            self._resolved[ref] = resolved
+            if complete:
+                self._complete.add(id(resolved))
+        return resolved
@@ -0,0 +1,79 @@
+"""Process-wide cache of the prefixed JSON schemas of models."""
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
+
+from sio_asyncapi._compat import get_model_adapter
+
+from .utils import insert_prepath, map_refs
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .snapshot import SpecSnapshot
+
+_SCHEMAS: "weakref.WeakKeyDictionary[type, tuple[Any, Dict[str, Dict[str, Any]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_LOCK = threading.Lock()
+
+
+def _model_stamp(model: Type[Any]) -> Any:
+    """Return an object replaced when a model is rebuilt in place (e.g. ``model_rebuild``)."""
+    return model.__dict__.get("__pydantic_validator__")
+
+
+def prefixed_schema(
+    model: Type[Any],
+    prepath: str,
+    snapshot: Optional["SpecSnapshot"] = None,
+) -> Dict[str, Any]:
+    """Return the JSON schema of a model with ``prepath`` inserted in its local refs.
+
+    The schema is generated once per model class; the variant of every prepath is
+    derived from it once and shared by every caller, so it must not be modified
+    (``AsyncAPIDoc`` stores copies). Entries are keyed by class: a model redefined
+    on reload is a new class and gets a new entry, the old one goes away with the
+    old class.
+
+    Args:
+        model (Type[Any]): model class supported by :func:`sio_asyncapi._compat.get_model_adapter`
+        prepath (str): path inserted after the ``#`` of the refs, e.g. "/components/schemas/User"
+        snapshot (Optional[SpecSnapshot], optional): on-disk snapshot consulted before
+            generating a schema missing from the cache. Defaults to None.
+    """
+    adapter = get_model_adapter(model)
+    if not adapter.cacheable:
+        return _with_prepath(adapter.schema(), prepath)
+
+    stamp = _model_stamp(model)
+    entry = _SCHEMAS.get(model)
+    if entry is not None and entry[0] is stamp:
+        schema = entry[1].get(prepath)
+        if schema is not None:
+            return schema
+        base = entry[1].get("")
+    else:
+        base = None
+
+    if base is None:
+        base = snapshot.schema(model, "", adapter.schema) if snapshot is not None else adapter.schema()
+    # derived from the unprefixed schema, sharing its subtrees without refs
+    schema = _with_prepath(base, prepath)
+    with _LOCK:
+        entry = _SCHEMAS.get(model)
+        if entry is None or entry[0] is not stamp:
+            entry = _SCHEMAS[model] = (stamp, {})
+        entry[1].setdefault("", base)
+        return entry[1].setdefault(prepath, schema)
+
+
+def _with_prepath(schema: Dict[str, Any], prepath: str) -> Dict[str, Any]:
+    """Return ``schema`` with ``prepath`` inserted in its local refs, leaving it unchanged."""
+    if not prepath:
+        return schema
+    return map_refs(schema, lambda ref: insert_prepath(prepath, ref))
+
+
+def clear_schema_cache() -> None:
+    """Forget every cached schema, e.g. after models were changed in place."""
+    with _LOCK:
+        _SCHEMAS.clear()
@@ -0,0 +1,183 @@
+"""On-disk snapshot of generated schemas, shared by the processes of a deployment."""
+import atexit
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+import pydantic
+from loguru import logger
+
+from sio_asyncapi._compat import referenced_classes
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+SNAPSHOT_FORMAT = 1
+
+_FINGERPRINTS: "weakref.WeakKeyDictionary[type, Optional[str]]" = weakref.WeakKeyDictionary()
+
+
+def _library_versions() -> str:
+    return f"pydantic={pydantic.VERSION};msgspec={getattr(msgspec, '__version__', None)}"
+
+
+def _source_stamp(module_name: str) -> str:
+    """Return the path, mtime and size of the file defining a module."""
+    module_file = getattr(sys.modules.get(module_name), "__file__", None)
+    if not module_file:
+        return ""
+    try:
+        stat = os.stat(module_file)
+    except OSError:
+        return module_file
+    return f"{module_file}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def model_fingerprint(model: Type[Any]) -> Optional[str]:
+    """Return a key changing whenever the source of a model or of the models it uses changes.
+
+    It hashes the library versions and the qualified name and source file stamp
+    (path, mtime, size) of every class the model is built from. Returns None for
+    models that cannot be fingerprinted, such as classes defined in functions or
+    with unresolved forward refs.
+    """
+    try:
+        return _FINGERPRINTS[model]
+    except KeyError:
+        pass
+
+    fingerprint: Optional[str]
+    try:
+        classes = referenced_classes(model)
+    except Exception:  # noqa: BLE001 - unresolvable annotations, no fingerprint
+        fingerprint = None
+    else:
+        if any("<locals>" in cls.__qualname__ for cls in classes):
+            fingerprint = None
+        else:
+            digest = hashlib.sha256(_library_versions().encode())
+            for cls in sorted(classes, key=lambda cls: (cls.__module__, cls.__qualname__)):
+                digest.update(f"\n{cls.__module__}.{cls.__qualname__}@{_source_stamp(cls.__module__)}".encode())
+            fingerprint = digest.hexdigest()
+    _FINGERPRINTS[model] = fingerprint
+    return fingerprint
+
+
+class SpecSnapshot:
+    """Cache file of model schemas and of the last generated AsyncAPI document.
+
+    The first process generating the schemas writes them; later processes load
+    them instead of calling ``model_schema``. Schemas are keyed by
+    :func:`model_fingerprint`, so editing a model file invalidates its entry. The
+    file is written atomically by :meth:`save`, which ``materialize_docs`` calls,
+    and at interpreter exit, and keeps only the entries used by the process
+    writing it.
+
+    Example::
+        socketio = AsyncAPISocketIO(app, spec_snapshot="/var/cache/app/asyncapi-snapshot.json")
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Create a snapshot
+
+        Args:
+            path (Union[str, os.PathLike]): snapshot file, created on first save
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._loaded: Optional[Dict[str, Any]] = None
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._document: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        atexit.register(self.save)
+
+    def _read(self) -> Dict[str, Any]:
+        """Return the content of the snapshot file, read once."""
+        if self._loaded is None:
+            loaded: Dict[str, Any] = {}
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    loaded = json.load(file)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable AsyncAPI snapshot {self.path}: {e}")
+            if loaded.get("format") != SNAPSHOT_FORMAT or loaded.get("libraries") != _library_versions():
+                loaded = {}
+            self._loaded = loaded
+        return self._loaded
+
+    def schema(self, model: Type[Any], prepath: str, generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the snapshot schema of a model, generating and recording it on a miss."""
+        fingerprint = model_fingerprint(model)
+        if fingerprint is None:
+            return generate()
+        key = f"{fingerprint}{prepath}"
+        with self._lock:
+            schema = self._schemas.get(key) or self._read().get("schemas", {}).get(key)
+        if schema is not None:
+            with self._lock:
+                self._schemas[key] = schema
+            return schema
+
+        schema = generate()
+        with self._lock:
+            self._schemas[key] = schema
+            self._dirty = True
+        return schema
+
+    def document(self, registration_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the snapshot document if it was generated for the same registrations."""
+        with self._lock:
+            document = self._document or self._read().get("document")
+        if document is None or document.get("registration_hash") != registration_hash:
+            return None
+        return document["content"]
+
+    def store_document(self, registration_hash: str, content: Dict[str, Any]) -> None:
+        """Record the generated document of a set of registrations."""
+        with self._lock:
+            current = self._document or self._read().get("document")
+            if current is not None and current.get("registration_hash") == registration_hash:
+                self._document = current
+                return
+            self._document = {"registration_hash": registration_hash, "content": content}
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the snapshot file atomically if new entries were recorded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            content = {
+                "format": SNAPSHOT_FORMAT,
+                "libraries": _library_versions(),
+                "schemas": dict(self._schemas),
+                "document": self._document,
+            }
+            self._dirty = False
+        temporary_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.path.parent,
+                prefix=f".{self.path.name}.",
+                delete=False,
+            ) as file:
+                temporary_path = file.name
+                json.dump(content, file, separators=(",", ":"))
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write AsyncAPI snapshot {self.path}: {e}")
+            if temporary_path is not None and os.path.exists(temporary_path):
+                os.unlink(temporary_path)
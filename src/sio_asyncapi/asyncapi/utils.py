@@ -1,4 +1,5 @@
-from typing import Dict
+import copy
+from typing import Any, Callable, Dict, Iterator, Tuple
 
 
 def insert_prepath(prepath: str, path: str) -> str:
@@ -12,18 +13,60 @@ def add_ref_prepath(dict_obj: Dict, prepath: str):
     """
     Takes a dict with nested lists and dicts,
     and adds a prepath to all $ref fields.
+    The dict is modified in place, walking it once without recursion,
+    so deeply nested schemas do not hit the recursion limit.
     """
-    for key, value in dict_obj.items():
+    pending: list = [dict_obj]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == '$ref' and isinstance(value, str):
+                    node[key] = insert_prepath(prepath, value)
+                elif isinstance(value, (dict, list)):
+                    pending.append(value)
+        else:
+            pending.extend(item for item in node if isinstance(item, (dict, list)))
 
-        if key == '$ref':
-            path = dict_obj[key]
-            dict_obj[key] = insert_prepath(prepath, path)
 
-        elif isinstance(value, dict):
-            add_ref_prepath(value, prepath)
+def _children(node: Any) -> Iterator[Tuple[Any, Any]]:
+    return iter(node.items()) if isinstance(node, dict) else enumerate(node)
 
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict):
-                    add_ref_prepath(item, prepath)
 
+def map_refs(node: Any, rewrite: Callable[[str], str]) -> Any:
+    """
+    Returns a schema with every $ref string replaced by rewrite(ref).
+    The input is not modified, so it can be a shared (cached) schema:
+    only the dicts and lists on the path to a rewritten $ref are copied,
+    the other subtrees are shared with the input. The schema is walked
+    once without recursion.
+    """
+    if not isinstance(node, (dict, list)):
+        return node
+    result = node
+    # frames: [container, iterator over its children, copy if a child changed, key in parent]
+    stack: list = [[node, _children(node), None, None]]
+    while stack:
+        frame = stack[-1]
+        container, children = frame[0], frame[1]
+        for key, child in children:
+            if key == '$ref' and isinstance(child, str) and isinstance(container, dict):
+                rewritten = rewrite(child)
+                if rewritten != child:
+                    if frame[2] is None:
+                        frame[2] = copy.copy(container)
+                    frame[2][key] = rewritten
+            elif isinstance(child, (dict, list)) and child:
+                stack.append([child, _children(child), None, key])
+                break
+        else:
+            stack.pop()
+            mapped = container if frame[2] is None else frame[2]
+            if not stack:
+                result = mapped
+            elif mapped is not container:
+                parent = stack[-1]
+                if parent[2] is None:
+                    parent[2] = copy.copy(parent[0])
+                parent[2][frame[3]] = mapped
+    return result
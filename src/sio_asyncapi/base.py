@@ -0,0 +1,779 @@
+"""Validation and AsyncAPI documentation shared by the Socket.IO server classes."""
+import abc
+import inspect
+import os
+import threading
+from collections import Counter
+from functools import partial
+from typing import Any, Callable, Optional, Union
+
+from loguru import logger
+
+from sio_asyncapi import _compat
+from sio_asyncapi._compat import (
+    BaseValidationError,
+    ModelType,
+    get_model_adapter,
+    is_model_instance,
+    is_model_type,
+)
+from sio_asyncapi.allocations import AllocationTracker
+from sio_asyncapi.asyncapi.docs import AsyncAPIDoc, NotProvidedType
+from sio_asyncapi.asyncapi.snapshot import SpecSnapshot
+from sio_asyncapi.metrics import Counter as MetricsCounter, EventMetrics, MetricsRegistry
+from sio_asyncapi.offload import ValidationOffload, estimate_payload_size
+from sio_asyncapi.profiling import ProfileMode, ProfileSession
+from sio_asyncapi.serializers import get_json_encoder
+from sio_asyncapi.tracing import Tracer
+from sio_asyncapi.validation import ValidationPolicy
+
+
+DEFAULT_NAMESPACE = "/"
+
+
+def normalize_namespace(namespace: Optional[str]) -> str:
+    """Normalize Socket.IO namespace values."""
+    return namespace or DEFAULT_NAMESPACE
+
+
+def _raiser(error: BaseException) -> Callable[[Any], Any]:
+    """Return a validator re-raising an error caught while validating in an executor."""
+
+    def validate(_):
+        raise error
+
+    return validate
+
+
+def _emit_attributes(args: tuple, kwargs: dict) -> dict[str, Any]:
+    """Return the span attributes of an ``_emit_args(event, namespace, args, get_sid)`` call."""
+    event, namespace, emit_args = args[:3]
+    return {
+        "event": event,
+        "namespace": namespace,
+        "payload_size": estimate_payload_size(emit_args[0]) if emit_args else 0,
+    }
+
+
+class RequestValidationError(BaseValidationError):
+    pass
+
+
+class ResponseValidationError(BaseValidationError):
+    pass
+
+
+class EmitValidationError(BaseValidationError):
+    pass
+
+
+class AsyncAPIBase(abc.ABC):
+    """Mixin adding model validation and AsyncAPI generation to a Socket.IO server class.
+
+    Subclasses combine it with a server class and implement :meth:`_register_handler`
+    and :meth:`_event_sid`; ``_request_arg_index`` is the position of the payload in
+    the arguments the server passes to event handlers.
+    """
+
+    _request_arg_index = 0
+
+    def __init__(
+        self,
+        *args,
+        validate: bool = False,
+        generate_docs: bool = True,
+        version: str = "1.0.0",
+        title: str = "Demo Chat API",
+        description: str = "Demo Chat API",
+        server_url: str = "http://localhost:5000",
+        server_name: str = "BACKEND",
+        serialize_emits: bool = False,
+        validation_policy: Optional[ValidationPolicy] = None,
+        namespace_validation_policies: Optional[dict[str, ValidationPolicy]] = None,
+        ack_serializer: Union[str, Callable[[Any], Any]] = "model",
+        validation_offload: Optional[ValidationOffload] = None,
+        spec_snapshot: Optional[Union[str, "os.PathLike[str]", SpecSnapshot]] = None,
+        lazy_docs: bool = False,
+        hoist_definitions: bool = False,
+        metrics: Union[bool, MetricsRegistry] = False,
+        tracer: Optional[Tracer] = None,
+        allocation_tracker: Optional[AllocationTracker] = None,
+        **kwargs,
+    ):
+        """Create the AsyncAPI part of the server
+
+        Args:
+            validation (bool, optional): If True request and response will be validated. Defaults to True.
+            generate_docs (bool, optional): If True AsyncAPI specs will be generated. Defaults to False.
+            version (str, optional): AsyncAPI version. Defaults to "1.0.0".
+            title (str, optional): AsyncAPI title. Defaults to "Demo Chat API".
+            description (str, optional): AsyncAPI description. Defaults to "Demo Chat API".
+            server_url (str, optional): AsyncAPI server url. Defaults to "http://localhost:5000".
+            server_name (str, optional): AsyncAPI server name. Defaults to "BACKEND".
+            serialize_emits (bool, optional): If True payloads of documented emits are sent
+                as the dump of the validated model instance instead of the raw payload.
+                Defaults to False.
+            validation_policy (Optional[ValidationPolicy], optional): Default policy deciding
+                which messages are validated. Takes precedence over ``validate``. Defaults to None.
+            namespace_validation_policies (Optional[dict[str, ValidationPolicy]], optional):
+                Policies per namespace, taking precedence over ``validation_policy``.
+                Defaults to None.
+            ack_serializer (Union[str, Callable[[Any], Any]], optional): How model ACK
+                responses are serialized: "model" (the model's own JSON dump), "dict" (the
+                JSON-compatible dict, encoded once with the Socket.IO packet), a JSON backend
+                name ("json", "orjson", "msgspec", "auto") or a callable receiving the
+                JSON-compatible dict. Defaults to "model".
+            validation_offload (Optional[ValidationOffload], optional): Default executor
+                offload for the validation of large request payloads. Defaults to None.
+            spec_snapshot (Optional[Union[str, os.PathLike, SpecSnapshot]], optional): Snapshot
+                file of the generated schemas, loaded by later processes instead of
+                generating them again. Defaults to None.
+            lazy_docs (bool, optional): If True handler and emit registrations are only
+                recorded, and the AsyncAPI document is built on first access to
+                ``asyncapi_doc`` or by :meth:`materialize_docs`. Defaults to False.
+            hoist_definitions (bool, optional): If True nested model definitions are stored
+                once in ``components/schemas`` instead of inside every schema using them.
+                Defaults to False.
+            metrics (Union[bool, MetricsRegistry], optional): If True (or a registry) the
+                duration of the request validation, handler, response validation and
+                serialization of every event and of emit validation and serialization
+                are recorded per event and namespace in ``metrics``. Defaults to False.
+            tracer (Optional[Tracer], optional): Tracer recording a span per event and
+                emit, with nested spans for the same phases. Defaults to None.
+            allocation_tracker (Optional[AllocationTracker], optional): Tracker of the
+                events registered with ``track_allocations=True``; created on first
+                use, reporting to ``metrics``, if None. Defaults to None.
+        """
+        self.validate = validate
+        self.serialize_emits = serialize_emits
+        self.validation_policy = validation_policy
+        self.namespace_validation_policies = {
+            normalize_namespace(policy_namespace): policy
+            for policy_namespace, policy in (namespace_validation_policies or {}).items()
+        }
+        self.validation_violations: Counter[tuple[str, str, str]] = Counter()
+        self._violations_lock = threading.Lock()
+        self._emit_policies: dict[tuple[str, str], ValidationPolicy] = {}
+        self._emit_phases: dict[tuple[str, str, str, ModelType], Callable] = {}
+        self._emit_counters: dict[tuple[str, str], MetricsCounter] = {}
+        self.ack_serializer = ack_serializer
+        self._ack_encoder = self._resolve_ack_encoder(ack_serializer)
+        self.validation_offload = validation_offload
+        if metrics is True:
+            metrics = MetricsRegistry()
+        self.metrics: Optional[MetricsRegistry] = metrics or None
+        self.tracer = tracer
+        self.allocation_tracker = allocation_tracker
+        self._profile_sessions: dict[tuple[str, str], ProfileSession] = {}
+        self._profile_lock = threading.Lock()
+        self._traced_emit_args: Optional[Callable[..., tuple]] = None
+        if tracer is not None:
+            self._traced_emit_args = tracer.traced("emit", self._emit_args, get_attributes=_emit_attributes)
+        self.generate_docs = generate_docs
+        if spec_snapshot is not None and not isinstance(spec_snapshot, SpecSnapshot):
+            spec_snapshot = SpecSnapshot(spec_snapshot)
+        self._new_doc = partial(
+            AsyncAPIDoc.default_init,
+            version=version,
+            title=title,
+            description=description,
+            server_url=server_url,
+            server_name=server_name,
+            snapshot=spec_snapshot,
+            hoist_definitions=hoist_definitions,
+        )
+        self._docs_lock = threading.Lock()
+        self._doc_registrations: list[tuple[str, dict[str, Any]]] = []
+        self._asyncapi_doc: Optional[AsyncAPIDoc] = None
+        if not lazy_docs:
+            self._asyncapi_doc = self._new_doc()
+        self.emit_models: dict[tuple[str, str], ModelType] = {}
+        super().__init__(*args, **kwargs)
+
+    @property
+    def asyncapi_doc(self) -> AsyncAPIDoc:
+        """The AsyncAPI document, built from the recorded registrations on first access."""
+        return self._asyncapi_doc or self._materialize_doc()
+
+    def _materialize_doc(self) -> AsyncAPIDoc:
+        with self._docs_lock:
+            if self._asyncapi_doc is None:
+                doc = self._new_doc()
+                doc.add_registrations(self._doc_registrations)
+                self._doc_registrations = []
+                self._asyncapi_doc = doc
+            return self._asyncapi_doc
+
+    def _materialize_and_save(self) -> None:
+        self._materialize_doc().save_snapshot()
+
+    @asyncapi_doc.setter
+    def asyncapi_doc(self, doc: AsyncAPIDoc) -> None:
+        with self._docs_lock:
+            self._asyncapi_doc = doc
+            self._doc_registrations = []
+
+    def materialize_docs(self, background: bool = False) -> Optional[threading.Thread]:
+        """Build the lazily recorded AsyncAPI document now and, with ``spec_snapshot``,
+        write the snapshot file. Call it once the handlers are registered.
+
+        Args:
+            background (bool, optional): If True the document is built in a daemon
+                thread, which is returned. Defaults to False.
+        """
+        if not background:
+            self._materialize_and_save()
+            return None
+        thread = threading.Thread(
+            target=self._materialize_and_save,
+            name="sio-asyncapi-docs",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _add_to_docs(self, method: str, **kwargs: Any) -> None:
+        """Call an ``add_new_*`` method of the document, or record it until the document is built."""
+        with self._docs_lock:
+            if self._asyncapi_doc is None:
+                self._doc_registrations.append((method, kwargs))
+                return
+            doc = self._asyncapi_doc
+        getattr(doc, method)(**kwargs)
+
+    @abc.abstractmethod
+    def _register_handler(self, message: str, namespace: Optional[str], handler: Callable) -> None:
+        """Register the validating wrapper with the underlying server."""
+
+    @abc.abstractmethod
+    def _event_sid(self, args: tuple) -> Optional[str]:
+        """Return the sid of the client that sent the event being handled."""
+
+    @staticmethod
+    def _resolve_ack_encoder(
+        ack_serializer: Union[str, Callable[[Any], Any]],
+    ) -> Optional[Callable[[Any], Any]]:
+        """Return the encoder applied to JSON-compatible ACK dumps, None for the model's own dump."""
+        if callable(ack_serializer):
+            return ack_serializer
+        if ack_serializer == "model":
+            return None
+        if ack_serializer == "dict":
+            return lambda value: value
+        return get_json_encoder(ack_serializer)
+
+    def _validation_policy(
+        self,
+        policy: Optional[ValidationPolicy],
+        namespace: str,
+    ) -> Optional[ValidationPolicy]:
+        """Return the policy of an event, falling back to its namespace and then the instance."""
+        return policy or self.namespace_validation_policies.get(namespace) or self.validation_policy
+
+    def _should_validate(
+        self,
+        policy: Optional[ValidationPolicy],
+        get_sid: Callable[[], Optional[str]],
+    ) -> bool:
+        """Decide whether the current message is validated; ``validate`` applies without a policy."""
+        if policy is None:
+            return self.validate
+        return policy.should_validate(get_sid)
+
+    def _record_violation(self, kind: str, event: str, namespace: str) -> None:
+        """Count a validation failure for ``(kind, event, namespace)``."""
+        with self._violations_lock:
+            self.validation_violations[(kind, event, namespace)] += 1
+
+    def _prepare_emit_args(
+        self,
+        event: str,
+        namespace: str,
+        args: tuple,
+        get_sid: Callable[[], Optional[str]],
+    ) -> tuple:
+        """Validate the emit payload and replace model instances by their JSON-compatible dump."""
+        if self._traced_emit_args is not None:
+            return self._traced_emit_args(event, namespace, args, get_sid)
+        return self._emit_args(event, namespace, args, get_sid)
+
+    def _emit_args(
+        self,
+        event: str,
+        namespace: str,
+        args: tuple,
+        get_sid: Callable[[], Optional[str]],
+    ) -> tuple:
+        payload = args[0] if args else None
+        event_key = (event, namespace)
+        model = self.emit_models.get(event_key)
+        policy = self._validation_policy(self._emit_policies.get(event_key), namespace)
+        if self.metrics is not None:
+            emits = self._emit_counters.get(event_key)
+            if emits is None:
+                emits = self.metrics.event(event, namespace).counter("sio_asyncapi_emits_total")
+                self._emit_counters[event_key] = emits
+            emits.inc()
+        instance = None
+        if model is not None and isinstance(payload, model):
+            instance = payload
+        elif model is not None and self._should_validate(policy, get_sid):
+            validate = self._emit_phase("emit_validation", event, namespace, model)
+            try:
+                instance = validate(payload)
+            except _compat.MODEL_VALIDATION_ERRORS as e:
+                self._record_violation("emit", event, namespace)
+                if policy is not None and not policy.raise_errors:
+                    logger.warning(f"Error validating emit '{event}': {e}")
+                    return args
+                logger.error(f"Error validating emit '{event}': {e}")
+                raise EmitValidationError.init_from_super(e) from e
+            if not self.serialize_emits:
+                return args
+        elif is_model_instance(payload):
+            instance = payload
+
+        if instance is None:
+            return args
+        dump = self._emit_phase("emit_serialization", event, namespace, type(instance))
+        return (dump(instance), *args[1:])
+
+    def _emit_phase(self, phase: str, event: str, namespace: str, model: ModelType) -> Callable:
+        """Return the validate ("emit_validation") or dump ("emit_serialization") function
+        of the emits of a model on an event, timed and traced when enabled.
+
+        It is built once per phase, event, namespace and model, not on every emit.
+        """
+        key = (phase, event, namespace, model)
+        func = self._emit_phases.get(key)
+        if func is not None:
+            return func
+        adapter = get_model_adapter(model)
+        func = adapter.validate if phase == "emit_validation" else adapter.dump_jsonable
+        if self.metrics is not None or self.tracer is not None:
+            event_metrics = self.metrics.event(event, namespace) if self.metrics is not None else None
+            func = self._instrument(phase, func, event_metrics, event, namespace)
+        if adapter.cacheable:
+            self._emit_phases[key] = func
+        return func
+
+    def _instrument(
+        self,
+        phase: str,
+        func: Callable,
+        event_metrics: Optional[EventMetrics],
+        event: str,
+        namespace: str,
+        is_async: bool = False,
+        allocation_tracker: Optional[AllocationTracker] = None,
+        subject: str = "",
+    ) -> Callable:
+        """Wrap a processing phase to be timed by the metrics, traced and have its
+        allocations tracked, when enabled."""
+        if allocation_tracker is not None:
+            tracked = allocation_tracker.tracked_async if is_async else allocation_tracker.tracked
+            func = tracked(event, namespace, phase, func, subject)
+        if event_metrics is not None:
+            func = (event_metrics.timed_async if is_async else event_metrics.timed)(phase, func)
+        if self.tracer is not None:
+            traced = self.tracer.traced_async if is_async else self.tracer.traced
+            func = traced(phase, func, {"event": event, "namespace": namespace})
+        return func
+
+    def _allocation_tracker(self) -> AllocationTracker:
+        """Return the allocation tracker, created on first use."""
+        if self.allocation_tracker is None:
+            self.allocation_tracker = AllocationTracker(self.metrics)
+        return self.allocation_tracker
+
+    def doc_emit(
+        self,
+        event: str,
+        model: ModelType,
+        discription: str = "",
+        namespace: Optional[str] = None,
+        validation_policy: Optional[ValidationPolicy] = None,
+    ):
+        """
+        Decorator to register/document a SocketIO emit event. This will be
+        used to generate AsyncAPI specs and validate emits calls.
+
+        Args:
+            event (str): event name
+            model (ModelType): pydantic model, dataclass or msgspec.Struct
+            validation_policy (Optional[ValidationPolicy], optional): Policy deciding which
+                emits of this event are validated. Defaults to None.
+        """
+
+        def decorator(func):
+            normalized_namespace = normalize_namespace(namespace)
+            event_key = (event, normalized_namespace)
+            if self.emit_models.get(event_key):
+                raise ValueError(
+                    f"Event {event} already registered for namespace {normalized_namespace}"
+                )
+            self.emit_models[event_key] = model
+            if validation_policy is not None:
+                self._emit_policies[event_key] = validation_policy
+            self._add_to_docs(
+                "add_new_sender",
+                event=event,
+                payload_model=model,
+                description=discription,
+                namespace=normalized_namespace,
+            )
+            return func
+
+        return decorator
+
+    def _on_decorator(
+        self,
+        message: str,
+        namespace: Optional[str],
+        *,
+        get_from_typehint: bool,
+        response_model: Optional[Union[ModelType, NotProvidedType]],
+        request_model: Optional[Union[ModelType, NotProvidedType]],
+        validation_policy: Optional[ValidationPolicy],
+        validation_offload: Optional[ValidationOffload] = None,
+        track_allocations: bool = False,
+    ):
+        """Build the decorator returned by the ``on`` method of the server classes."""
+
+        def decorator(handler: Callable):
+            nonlocal request_model
+            nonlocal response_model
+            if get_from_typehint:
+                try:
+                    request_arg_name = inspect.getfullargspec(handler)[0][self._request_arg_index]
+                except IndexError:
+                    posible_request_model = None
+                else:
+                    posible_request_model = handler.__annotations__.get(
+                        request_arg_name, "NotProvided"
+                    )
+                posible_response_model = handler.__annotations__.get(
+                    "return", "NotProvided"
+                )
+                if request_model is None:
+                    request_model = posible_request_model  # type: ignore
+                if response_model is None:
+                    response_model = posible_response_model  # type: ignore
+
+            if self.generate_docs:
+                self._add_to_docs(
+                    "add_new_receiver",
+                    handler=handler,
+                    name=message,
+                    ack_data_model=response_model,
+                    payload_model=request_model,
+                    namespace=normalize_namespace(namespace),
+                )
+
+            wrapper = self._handle_all(
+                request_model=request_model,
+                response_model=response_model,
+                message=message,
+                namespace=normalize_namespace(namespace),
+                validation_policy=validation_policy,
+                validation_offload=validation_offload,
+                track_allocations=track_allocations,
+            )(handler)
+
+            self._register_handler(message, namespace, wrapper)
+            return wrapper
+
+        return decorator
+
+    def profile_event(
+        self,
+        event: str,
+        namespace: Optional[str] = None,
+        *,
+        calls: Optional[int] = None,
+        seconds: Optional[float] = None,
+        mode: ProfileMode = "cprofile",
+        output_dir: Union[str, "os.PathLike[str]"] = ".",
+        interval: float = 0.001,
+    ) -> ProfileSession:
+        """Profile the next calls of an event handler, without restarting the server.
+
+        The validation, handler and serialization of the next ``calls`` events (or
+        of the events received in the next ``seconds``) are profiled and the
+        aggregated results are written to ``output_dir``: a ``.pstats`` file with
+        "cprofile", a ``.collapsed`` flamegraph file with "sampling".
+
+        Example::
+            session = socketio.profile_event("download_file", calls=100, output_dir="/tmp")
+            session.wait(timeout=60)  # paths of the written files
+
+        Args:
+            event (str): event name
+            namespace (Optional[str], optional): event namespace. Defaults to None.
+            calls (Optional[int], optional): number of calls profiled. Defaults to None.
+            seconds (Optional[float], optional): profiling duration. Defaults to None.
+            mode (ProfileMode, optional): "cprofile" (deterministic, every function
+                call) or "sampling" (statistical, lower overhead). Defaults to "cprofile".
+            output_dir (Union[str, os.PathLike], optional): directory of the result
+                files. Defaults to ".".
+            interval (float, optional): sampling interval in seconds. Defaults to 0.001.
+
+        Raises: ValueError if the event is already being profiled
+        """
+        key = (event, normalize_namespace(namespace))
+
+        def on_finish(session: ProfileSession) -> None:
+            with self._profile_lock:
+                if self._profile_sessions.get(key) is session:
+                    del self._profile_sessions[key]
+
+        with self._profile_lock:
+            if key in self._profile_sessions:
+                raise ValueError(f"Event {event} of namespace {key[1]} is already being profiled")
+            session = ProfileSession(
+                event,
+                key[1],
+                calls=calls,
+                seconds=seconds,
+                mode=mode,
+                output_dir=output_dir,
+                interval=interval,
+                on_finish=on_finish,
+            )
+            self._profile_sessions[key] = session
+        return session
+
+    def get_agent_schema(self):
+        """Return the compact agent-friendly event catalog."""
+        return self.asyncapi_doc.get_agent_schema()
+
+    def agent_schema_view(self):
+        """Return a read-only view of the agent event catalog, shared until it changes."""
+        return self.asyncapi_doc.agent_schema_view()
+
+    def get_agent_schema_json(self) -> str:
+        """Return the compact agent-friendly event catalog as JSON."""
+        return self.asyncapi_doc.get_agent_schema_json()
+
+    def _handle_all(
+        self,
+        response_model: Optional[Union[ModelType, NotProvidedType]] = None,
+        request_model: Optional[Union[ModelType, NotProvidedType]] = None,
+        message: Optional[str] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        validation_policy: Optional[ValidationPolicy] = None,
+        validation_offload: Optional[ValidationOffload] = None,
+        track_allocations: bool = False,
+    ):
+        """Decorator to validate request and response with pydantic models
+
+        Coroutine handlers get a coroutine wrapper, so async servers can await them.
+        Large payloads are validated in the executor of the validation offload, if any.
+
+        Args:
+            handler (Callable, optional): handler function. Defaults to None.
+            response_model (Optional[ModelType], optional): Acknowledge model used
+                for validation and documentation. Defaults to None.
+            request_model (Optional[ModelType], optional): Request payload model used
+                for validation and documentation. Defaults to None.
+            message (Optional[str], optional): event name used to count violations.
+                Defaults to None.
+            namespace (str, optional): event namespace. Defaults to "/".
+            validation_policy (Optional[ValidationPolicy], optional): event validation policy.
+                Defaults to None.
+            validation_offload (Optional[ValidationOffload], optional): event validation
+                offload, falling back to the instance one. Defaults to None.
+            track_allocations (bool, optional): If True the memory allocated by the
+                phases of the event is recorded by the allocation tracker. Defaults to False.
+
+        Raises: RequestValidationError, ResponseValidationError
+        """
+
+        # Resolve the models once per handler; the wrappers below run for every event.
+        request_adapter = None
+        if isinstance(request_model, type) and is_model_type(request_model):
+            request_adapter = get_model_adapter(request_model)
+        response_adapter = None
+        if isinstance(response_model, type) and is_model_type(response_model):
+            response_adapter = get_model_adapter(response_model)
+        event = message or ""
+        request_index = self._request_arg_index
+        profile_sessions = self._profile_sessions
+        profile_key = (event, namespace)
+
+        def request_policy(args: tuple):
+            policy = self._validation_policy(validation_policy, namespace)
+            return policy, self._should_validate(policy, lambda: self._event_sid(args))
+
+        def request_payload(args: tuple, kwargs: dict) -> tuple[bool, Any]:
+            """Return whether a request payload was passed to the handler, and the payload."""
+            if len(args) > request_index:
+                return True, args[request_index]
+            if "request" in kwargs:
+                return True, kwargs["request"]
+            return False, None
+
+        def offload_for(
+            args: tuple, kwargs: dict, policy, validating: bool
+        ) -> Optional[tuple[ValidationOffload, ModelType, Any]]:
+            """Return the offload, model and payload when the request validation is offloaded."""
+            offload = validation_offload or self.validation_offload
+            if offload is None or request_adapter is None or not (validating or policy is None):
+                return None
+            provided, payload = request_payload(args, kwargs)
+            if not provided or not offload.should_offload(request_adapter.model, payload):
+                return None
+            return offload, request_adapter.model, payload
+
+        def before_handler(
+            args: tuple,
+            kwargs: dict,
+            policy: Optional[ValidationPolicy],
+            validating: bool,
+            validate: Optional[Callable[[Any], Any]] = None,
+        ):
+            request_came_as_arg = False
+            request_provided = False
+            request = None
+            if len(args) > request_index:
+                request_came_as_arg = True
+                request_provided = True
+                request = args[request_index]
+            elif "request" in kwargs:
+                request_provided = True
+                request = kwargs.get("request")
+
+            if request_provided and request_adapter is not None:
+                if validating or policy is None:
+                    # A single pass both checks the payload and builds the handler's model.
+                    try:
+                        request = (validate or request_adapter.validate)(request)
+                    except _compat.MODEL_VALIDATION_ERRORS as e:
+                        if not validating:
+                            raise
+                        self._record_violation("request", event, namespace)
+                        if policy is None or policy.raise_errors:
+                            logger.error(f"ValidationError for incoming request: {e}")
+                            raise RequestValidationError.init_from_super(e) from e
+                        logger.warning(f"ValidationError for incoming request: {e}")
+                        request = request_adapter.construct(request)
+                else:
+                    request = request_adapter.construct(request)
+
+                if request_came_as_arg:
+                    args = (*args[:request_index], request, *args[request_index + 1:])
+                else:
+                    kwargs["request"] = request
+            return args, kwargs
+
+        def validate_response(response: Any, policy: Optional[ValidationPolicy], validating: bool):
+            if response is not None and response_adapter is not None and validating:
+                try:
+                    response_adapter.validate(response)
+                except _compat.MODEL_VALIDATION_ERRORS as e:
+                    self._record_violation("response", event, namespace)
+                    if policy is None or policy.raise_errors:
+                        logger.error(f"ValidationError for outgoing response: {e}")
+                        raise ResponseValidationError.init_from_super(e) from e
+                    logger.warning(f"ValidationError for outgoing response: {e}")
+            return response
+
+        def serialize_response(response: Any):
+            if response is None:
+                return None
+            if response_adapter is not None and type(response) is response_adapter.model:
+                adapter = response_adapter
+            elif is_model_instance(response):
+                adapter = get_model_adapter(type(response))
+            else:
+                return response
+            if self._ack_encoder is None:
+                return adapter.dump_json(response)
+            return self._ack_encoder(adapter.dump_jsonable(response))
+
+        # Phases are timed and traced by wrapping them once here, so nothing is added
+        # to the wrappers below when metrics and tracing are disabled.
+        event_metrics = self.metrics.event(event, namespace) if self.metrics is not None else None
+        instrument = partial(
+            self._instrument,
+            event_metrics=event_metrics,
+            event=event,
+            namespace=namespace,
+            allocation_tracker=self._allocation_tracker() if track_allocations else None,
+        )
+        request_name = request_adapter.model.__name__ if request_adapter is not None else ""
+        response_name = response_adapter.model.__name__ if response_adapter is not None else ""
+        validate_response = instrument("response_validation", validate_response, subject=response_name)
+        serialize_response = instrument("serialization", serialize_response, subject=response_name)
+
+        def event_attributes(args: tuple, kwargs: dict) -> dict[str, Any]:
+            provided, payload = request_payload(args, kwargs)
+            return {"sid": self._event_sid(args), "payload_size": estimate_payload_size(payload) if provided else 0}
+
+        def trace_event(wrapper: Callable, is_async: bool = False) -> Callable:
+            if self.tracer is None:
+                return wrapper
+            traced = self.tracer.traced_async if is_async else self.tracer.traced
+            return traced("event", wrapper, {"event": event, "namespace": namespace}, event_attributes)
+
+        def decorator(handler: Callable):
+            if inspect.iscoroutinefunction(handler):
+
+                async def prepare_async(args: tuple, kwargs: dict, policy, validating: bool):
+                    validate = None
+                    offloaded = offload_for(args, kwargs, policy, validating)
+                    if offloaded is not None:
+                        offload, model, payload = offloaded
+                        try:
+                            validated = await offload.validate_async(model, payload)
+                        except _compat.MODEL_VALIDATION_ERRORS as e:
+                            validate = _raiser(e)
+                        else:
+                            validate = lambda _: validated  # noqa: E731
+                    return before_handler(args, kwargs, policy, validating, validate)
+
+                prepare_async = instrument(
+                    "request_validation", prepare_async, is_async=True, subject=request_name
+                )
+                call_handler = instrument("handler", handler, is_async=True, subject=handler.__qualname__)
+
+                async def process_async(*args, **kwargs):
+                    policy, validating = request_policy(args)
+                    args, kwargs = await prepare_async(args, kwargs, policy, validating)
+                    response = validate_response(await call_handler(*args, **kwargs), policy, validating)
+                    return serialize_response(response)
+
+                async def async_wrapper(*args, **kwargs):
+                    session = profile_sessions.get(profile_key) if profile_sessions else None
+                    if session is not None:
+                        return await session.call_async(process_async, args, kwargs)
+                    return await process_async(*args, **kwargs)
+
+                return trace_event(async_wrapper, is_async=True)
+
+            def prepare(args: tuple, kwargs: dict, policy, validating: bool):
+                validate = None
+                offloaded = offload_for(args, kwargs, policy, validating)
+                if offloaded is not None:
+                    offload, model, _ = offloaded
+                    validate = partial(offload.validate, model)
+                return before_handler(args, kwargs, policy, validating, validate)
+
+            prepare = instrument("request_validation", prepare, subject=request_name)
+            call_handler = instrument("handler", handler, subject=getattr(handler, "__qualname__", ""))
+
+            def process(*args, **kwargs):
+                policy, validating = request_policy(args)
+                args, kwargs = prepare(args, kwargs, policy, validating)
+                response = validate_response(call_handler(*args, **kwargs), policy, validating)
+                return serialize_response(response)
+
+            def wrapper(*args, **kwargs):
+                session = profile_sessions.get(profile_key) if profile_sessions else None
+                if session is not None:
+                    return session.call(process, args, kwargs)
+                return process(*args, **kwargs)
+
+            return trace_event(wrapper)
+
+        return decorator
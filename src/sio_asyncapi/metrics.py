@@ -0,0 +1,334 @@
+"""Per-event counters and latency histograms, rendered in the Prometheus text format."""
+import bisect
+import math
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import flask
+from flask import Flask
+
+# Seconds; the defaults of the Prometheus client libraries with a finer low end,
+# since validating a small payload takes microseconds.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_ENDPOINT = "sio_asyncapi_metrics"
+
+
+class _ShardOwner:
+    """Held in the thread-local storage of a shard; collected when its thread ends."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded:
+    """Values written by every thread into its own shard and summed on read.
+
+    The hot path only touches the shard of the current thread (or greenlet, when
+    monkey patched), so no lock is taken once the shard exists. When the thread
+    ends, its shard is merged into the totals of the finished threads, so the
+    number of shards follows the number of live threads.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._shards: Dict[int, list] = {}
+        self._finished = [0] * size
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list:
+        try:
+            return self._local.shard
+        except AttributeError:
+            return self._new_shard()
+
+    def _new_shard(self) -> list:
+        shard = [0] * self._size
+        owner = _ShardOwner()
+        with self._lock:
+            self._shards[id(owner)] = shard
+        weakref.finalize(owner, _merge_shard, weakref.ref(self), id(owner))
+        self._local.owner = owner
+        self._local.shard = shard
+        return shard
+
+    def _merge(self, key: int) -> None:
+        with self._lock:
+            shard = self._shards.pop(key, None)
+            if shard is not None:
+                for index, value in enumerate(shard):
+                    self._finished[index] += value
+
+    def _totals(self) -> list:
+        with self._lock:
+            totals = list(self._finished)
+            for shard in self._shards.values():
+                for index, value in enumerate(shard):
+                    totals[index] += value
+        return totals
+
+
+def _merge_shard(ref: "weakref.ref[_Sharded]", key: int) -> None:
+    sharded = ref()
+    if sharded is not None:
+        sharded._merge(key)
+
+
+class Counter(_Sharded):
+    """Monotonic counter of one label set."""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, value: float = 1) -> None:
+        self._shard()[0] += value
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class Histogram(_Sharded):
+    """Distribution of observed values of one label set, in fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # one count per bucket, the +Inf bucket and the sum of the observed values
+        super().__init__(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return the cumulative bucket counts, the count and the sum of the observations."""
+        totals = self._totals()
+        cumulative = []
+        count = 0
+        for bucket_count in totals[:-1]:
+            count += bucket_count
+            cumulative.append(count)
+        return {
+            "buckets": dict(zip((*self.buckets, math.inf), cumulative)),
+            "count": count,
+            "sum": totals[-1],
+        }
+
+
+class EventMetrics:
+    """Metrics of one (event, namespace), resolved once when its handler is registered."""
+
+    def __init__(self, registry: "MetricsRegistry", event: str, namespace: str) -> None:
+        self._registry = registry
+        self._labels = (("event", event), ("namespace", namespace))
+
+    def duration(self, phase: str) -> Histogram:
+        """Return the latency histogram of a phase."""
+        return self._registry.histogram(
+            "sio_asyncapi_phase_duration_seconds", (*self._labels, ("phase", phase))
+        )
+
+    def errors(self, phase: str) -> Counter:
+        """Return the counter of the exceptions raised during a phase."""
+        return self._registry.counter("sio_asyncapi_errors_total", (*self._labels, ("phase", phase)))
+
+    def counter(self, name: str) -> Counter:
+        """Return an event counter, e.g. "sio_asyncapi_emits_total"."""
+        return self._registry.counter(name, self._labels)
+
+    def timed(self, phase: str, func: Callable) -> Callable:
+        """Wrap ``func`` to observe its duration and count its exceptions under ``phase``."""
+        duration = self.duration(phase)
+        errors = self.errors(phase)
+        clock = self._registry.clock
+
+        def timed_func(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(clock() - start)
+
+        return timed_func
+
+    def timed_async(self, phase: str, func: Callable) -> Callable:
+        """Coroutine version of :meth:`timed`."""
+        duration = self.duration(phase)
+        errors = self.errors(phase)
+        clock = self._registry.clock
+
+        async def timed_func(*args, **kwargs):
+            start = clock()
+            try:
+                return await func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(clock() - start)
+
+        return timed_func
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Counters and histograms of the hot path of a server, keyed by name and labels.
+
+    Example::
+        socketio = AsyncAPISocketIO(app, metrics=True, metrics_url="/metrics")
+        socketio.metrics.render_prometheus()
+    """
+
+    HELP = {
+        "sio_asyncapi_phase_duration_seconds": "Time spent per event and processing phase.",
+        "sio_asyncapi_errors_total": "Exceptions raised per event and processing phase.",
+        "sio_asyncapi_emits_total": "Emitted events.",
+    }
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        clock: Optional[Callable[[], float]] = None,
+    ) -> None:
+        """Create a registry
+
+        Args:
+            buckets (Sequence[float], optional): upper bounds of the histogram buckets,
+                in seconds. Defaults to DEFAULT_BUCKETS.
+            clock (Optional[Callable[[], float]], optional): monotonic clock in seconds.
+                Defaults to time.perf_counter.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.clock = clock or time.perf_counter
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._events: Dict[Tuple[str, str], EventMetrics] = {}
+        self._lock = threading.Lock()
+        self.help = dict(self.HELP)
+
+    def describe(self, name: str, text: str) -> None:
+        """Set the help text rendered for a metric name."""
+        self.help[name] = text
+
+    def counter(self, name: str, labels: Labels = ()) -> Counter:
+        """Return the counter of a name and label set, created on first use."""
+        key = (name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        labels: Labels = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """Return the histogram of a name and label set, created on first use.
+
+        ``buckets`` (the registry ones by default) are used when the histogram is created.
+        """
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(buckets or self.buckets)
+        return histogram
+
+    def event(self, event: str, namespace: str) -> EventMetrics:
+        """Return the metrics of an (event, namespace)."""
+        key = (event, namespace)
+        metrics = self._events.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._events.setdefault(key, EventMetrics(self, event, namespace))
+        return metrics
+
+    def collect(self) -> Dict[str, list]:
+        """Return the current values: counters and histogram snapshots with their labels."""
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": counter.value}
+                for (name, labels), counter in sorted(self._counters.items(), key=lambda item: item[0])
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), **histogram.snapshot()}
+                for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0])
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        return "".join(self._prometheus_lines())
+
+    def _prometheus_lines(self) -> Iterator[str]:
+        collected = self.collect()
+        families: Dict[str, list] = {}
+        for sample in collected["counters"]:
+            families.setdefault(sample["name"], []).append(("counter", sample))
+        for sample in collected["histograms"]:
+            families.setdefault(sample["name"], []).append(("histogram", sample))
+
+        for name, samples in families.items():
+            if name in self.help:
+                yield f"# HELP {name} {self.help[name]}\n"
+            yield f"# TYPE {name} {samples[0][0]}\n"
+            for kind, sample in samples:
+                labels = sample["labels"]
+                if kind == "counter":
+                    yield f"{name}{_format_labels(labels)} {_format_value(sample['value'])}\n"
+                    continue
+                for bound, count in sample["buckets"].items():
+                    bucket_labels = {**labels, "le": "+Inf" if bound == math.inf else repr(bound)}
+                    yield f"{name}_bucket{_format_labels(bucket_labels)} {count}\n"
+                yield f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}\n"
+                yield f"{name}_count{_format_labels(labels)} {sample['count']}\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def register_metrics_route(app: Flask, get_registry: Callable[[], MetricsRegistry], rule: str) -> None:
+    """Serve the metrics of a registry in the Prometheus text format on a Flask app.
+
+    Nothing is registered when the app already serves the metrics endpoint.
+
+    Args:
+        app (Flask): application the route is added to
+        get_registry (Callable[[], MetricsRegistry]): returns the registry to render
+        rule (str): URL rule, e.g. "/metrics"
+    """
+
+    if METRICS_ENDPOINT in app.view_functions:
+        return
+
+    def view():
+        return flask.Response(get_registry().render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_url_rule(rule, METRICS_ENDPOINT, view)
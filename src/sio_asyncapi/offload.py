@@ -0,0 +1,161 @@
+"""Run the validation of large payloads off the thread or event loop serving them."""
+import asyncio
+import importlib
+import sys
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Collection, Optional, Type
+
+from sio_asyncapi._compat import model_validate
+
+SCALAR_SIZE = 8
+
+
+def estimate_payload_size(payload: Any, limit: Optional[int] = None) -> int:
+    """Roughly estimate the JSON size of a payload in bytes.
+
+    Strings and bytes count their length, other scalars ``SCALAR_SIZE``. The walk is
+    iterative and stops as soon as the estimate exceeds ``limit``.
+    """
+    size = 0
+    stack = [payload]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, dict):
+            size += len(value)
+            for key, item in value.items():
+                stack.append(key)
+                stack.append(item)
+        elif isinstance(value, (list, tuple)):
+            size += len(value)
+            stack.extend(value)
+        else:
+            size += SCALAR_SIZE
+        if limit is not None and size > limit:
+            break
+    return size
+
+
+def green_threadpool() -> Optional[Callable[..., Any]]:
+    """Return ``run(func, *args)`` running a call in an OS thread of the eventlet or
+    gevent thread pool while the hub keeps serving, None when neither monkey patched
+    the threads."""
+    if "eventlet" in sys.modules:
+        patcher = importlib.import_module("eventlet.patcher")
+        if patcher.is_monkey_patched("thread"):
+            return importlib.import_module("eventlet.tpool").execute
+    if "gevent" in sys.modules:
+        gevent = importlib.import_module("gevent")
+        if importlib.import_module("gevent.monkey").is_module_patched("threading"):
+            return lambda func, *args: gevent.get_hub().threadpool.apply(func, args)
+    return None
+
+
+class ValidationOffload:
+    """Validate large request payloads outside of the thread or event loop serving them.
+
+    Payloads estimated above ``min_payload_size`` are offloaded; at most ``max_pending``
+    validations are queued, further ones run inline so a burst of large payloads cannot
+    grow the queue without bound.
+
+    Where the validation runs depends on the server:
+
+    * asyncio servers await it in ``executor``, or the loop's default thread pool,
+      so the event loop keeps serving other clients meanwhile;
+    * without ``executor``, eventlet and gevent servers run it in the OS thread pool
+      of the hub (``eventlet.tpool``, the gevent hub thread pool), so the hub keeps
+      switching greenlets; threaded servers validate inline, since waiting on another
+      thread would only add latency: the validation holds the GIL either way;
+    * with ``executor``, sync servers submit it there and wait for the result. This is
+      only useful with a :class:`concurrent.futures.ProcessPoolExecutor` (with models
+      defined at module level, so they can be pickled), which validates in parallel.
+
+    Example::
+        offload = ValidationOffload(ProcessPoolExecutor(2), min_payload_size=256_000, max_pending=8)
+
+        @socketio.on("upload", request_model=BigListModel, validation_offload=offload)
+        def upload(request: BigListModel):
+            ...
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        *,
+        min_payload_size: int = 100_000,
+        max_pending: int = 32,
+        models: Optional[Collection[Type[Any]]] = None,
+    ) -> None:
+        """Create a validation offload
+
+        Args:
+            executor (Optional[Executor], optional): Executor running the validations,
+                typically a ProcessPoolExecutor. Defaults to None (see above).
+            min_payload_size (int, optional): Estimated payload size, in bytes, from which
+                validation is offloaded. Defaults to 100_000.
+            max_pending (int, optional): Maximum number of queued or running offloaded
+                validations. Defaults to 32.
+            models (Optional[Collection[Type[Any]]], optional): Only offload the validation
+                of these models. Defaults to None (all models).
+        """
+        self.executor = executor
+        self.min_payload_size = min_payload_size
+        self.max_pending = max_pending
+        self.models = frozenset(models) if models is not None else None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._green_run: Optional[Callable[..., Any]] = None
+        self._green_checked = False
+
+    def should_offload(self, model: Type[Any], payload: Any) -> bool:
+        """Return True when the payload is large enough to be validated in the executor."""
+        if self.models is not None and model not in self.models:
+            return False
+        return estimate_payload_size(payload, self.min_payload_size) > self.min_payload_size
+
+    def validate(self, model: Type[Any], payload: Any) -> Any:
+        """Validate in the executor, or the eventlet/gevent thread pool, and wait for the
+        result; inline when neither applies or the queue is full."""
+        executor = self.executor
+        if executor is None:
+            if not self._green_checked:
+                # The servers monkey patch before handling events, so this is settled by then.
+                self._green_run = green_threadpool()
+                self._green_checked = True
+            run = self._green_run
+            if run is None or not self._slots.acquire(blocking=False):
+                return model_validate(model, payload)
+            try:
+                return run(model_validate, model, payload)
+            finally:
+                self._slots.release()
+
+        if not self._slots.acquire(blocking=False):
+            return model_validate(model, payload)
+        try:
+            future = executor.submit(model_validate, model, payload)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    async def validate_async(self, model: Type[Any], payload: Any) -> Any:
+        """Validate in the executor without blocking the event loop; inline when the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            return model_validate(model, payload)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                model_validate,
+                model,
+                payload,
+            )
+        finally:
+            self._slots.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the executor down, if one was given."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
@@ -0,0 +1,236 @@
+"""On-demand profiling of the handlers of selected events."""
+import collections
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, Union
+
+ProfileMode = Literal["cprofile", "sampling"]
+
+
+def _collapsed_stack(frame: Any) -> str:
+    """Return a stack in the collapsed format of flamegraph tools, outermost frame first."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Sampler(threading.Thread):
+    """Daemon thread counting the stacks of the threads running profiled calls."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="sio-asyncapi-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: "collections.Counter[str]" = collections.Counter()
+        self.threads: set[int] = set()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[_collapsed_stack(frame)] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class ProfileSession:
+    """Profiling of the calls of one (event, namespace), started by ``profile_event``.
+
+    Calls are profiled until ``calls`` calls have started or ``seconds`` have
+    passed, whichever comes first; the results are written once the calls in
+    progress have returned. With "cprofile" the calls run under
+    :class:`cProfile.Profile` and a ``.pstats`` file is written (open it with
+    :mod:`pstats` or snakeviz). With "sampling" the stacks of the threads
+    running the calls are sampled every ``interval`` seconds and written as a
+    ``.collapsed`` file for flamegraph tools (flamegraph.pl, speedscope); the
+    overhead is lower and does not depend on the number of function calls.
+
+    A coroutine handler is profiled from the start to the end of its call, so
+    the other tasks scheduled meanwhile on the event loop are profiled too. The
+    same goes for eventlet and gevent servers: greenlets share the OS thread, so
+    cProfile attributes the time of the greenlets switched to during a profiled
+    call to that call.
+    """
+
+    def __init__(
+        self,
+        event: str,
+        namespace: str,
+        *,
+        calls: Optional[int] = None,
+        seconds: Optional[float] = None,
+        mode: ProfileMode = "cprofile",
+        output_dir: Union[str, "os.PathLike[str]"] = ".",
+        interval: float = 0.001,
+        on_finish: Optional[Callable[["ProfileSession"], None]] = None,
+    ) -> None:
+        """Create a profiling session
+
+        Args:
+            event (str): profiled event
+            namespace (str): namespace of the event
+            calls (Optional[int], optional): number of calls profiled. Defaults to None.
+            seconds (Optional[float], optional): profiling duration. Defaults to None.
+            mode (ProfileMode, optional): "cprofile" or "sampling". Defaults to "cprofile".
+            output_dir (Union[str, os.PathLike], optional): directory of the result files.
+                Defaults to ".".
+            interval (float, optional): sampling interval in seconds. Defaults to 0.001.
+            on_finish (Optional[Callable[[ProfileSession], None]], optional): called
+                once the results are written. Defaults to None.
+        """
+        if calls is None and seconds is None:
+            raise ValueError("calls or seconds must be set")
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Unknown profile mode {mode!r}")
+        self.event = event
+        self.namespace = namespace
+        self.max_calls = calls
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.calls = 0
+        self.paths: List[Path] = []
+        self.done = threading.Event()
+        self._on_finish = on_finish
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._finished = False
+        self._active = 0
+        # per thread: [profiler or None, calls in progress in the thread]
+        self._threads: Dict[int, list] = {}
+        self._profilers: List[cProfile.Profile] = []
+        self._sampler: Optional[_Sampler] = None
+        if mode == "sampling":
+            self._sampler = _Sampler(interval)
+            self._sampler.start()
+        self._timer: Optional[threading.Timer] = None
+        if seconds is not None:
+            self._timer = threading.Timer(seconds, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def call(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run ``func(*args, **kwargs)``, profiled while the session lasts."""
+        if not self._enter():
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._exit()
+
+    async def call_async(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Coroutine version of :meth:`call`."""
+        if not self._enter():
+            return await func(*args, **kwargs)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._exit()
+
+    def stop(self) -> None:
+        """Stop profiling new calls; the results are written when the current ones return."""
+        with self._lock:
+            self._stopping = True
+            finished = self._active == 0
+        if finished:
+            self._finish()
+
+    def wait(self, timeout: Optional[float] = None) -> List[Path]:
+        """Wait for the results and return the paths of the written files."""
+        self.done.wait(timeout)
+        return self.paths
+
+    def _enter(self) -> bool:
+        ident = threading.get_ident()
+        with self._lock:
+            if self._stopping:
+                return False
+            self.calls += 1
+            if self.max_calls is not None and self.calls >= self.max_calls:
+                self._stopping = True
+            self._active += 1
+            thread = self._threads.get(ident)
+            if thread is None:
+                thread = self._threads[ident] = [None, 0]
+            thread[1] += 1
+            if thread[1] == 1:
+                if self._sampler is not None:
+                    self._sampler.threads.add(ident)
+                else:
+                    thread[0] = thread[0] or cProfile.Profile()
+                    try:
+                        thread[0].enable()
+                    except ValueError:  # another profiler is active in this thread
+                        thread[0] = None
+        return True
+
+    def _exit(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            thread = self._threads[ident]
+            thread[1] -= 1
+            if thread[1] == 0:
+                if self._sampler is not None:
+                    self._sampler.threads.discard(ident)
+                elif thread[0] is not None:
+                    thread[0].disable()
+                    if thread[0] not in self._profilers:
+                        self._profilers.append(thread[0])
+            self._active -= 1
+            finished = self._stopping and self._active == 0
+        if finished:
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler.join()
+        # the session is unregistered even when the results cannot be written,
+        # so the event can be profiled again
+        try:
+            self._write_results()
+        finally:
+            if self._on_finish is not None:
+                self._on_finish(self)
+            self.done.set()
+
+    def _write_results(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{self.event}{self.namespace}").strip("_")
+        stem = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        if self._sampler is not None:
+            path = self.output_dir / f"{stem}.collapsed"
+            with open(path, "w", encoding="utf-8") as file:
+                for stack, count in self._sampler.stacks.most_common():
+                    file.write(f"{stack} {count}\n")
+            self.paths.append(path)
+        elif self._profilers:
+            stats = pstats.Stats(self._profilers[0])
+            for profiler in self._profilers[1:]:
+                stats.add(profiler)
+            path = self.output_dir / f"{stem}.pstats"
+            stats.dump_stats(path)
+            self.paths.append(path)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(event={self.event!r}, namespace={self.namespace!r}, "
+            f"mode={self.mode!r}, calls={self.calls}, done={self.done.is_set()})"
+        )
@@ -0,0 +1,56 @@
+"""JSON encoders used to serialize Socket.IO ACK payloads."""
+import json
+from typing import Any, Callable
+
+JSONEncoder = Callable[[Any], str]
+
+
+def _stdlib_encoder() -> JSONEncoder:
+    return json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def _orjson_encoder() -> JSONEncoder:
+    import orjson
+
+    dumps = orjson.dumps
+    return lambda value: dumps(value).decode()
+
+
+def _msgspec_encoder() -> JSONEncoder:
+    import msgspec
+
+    encode = msgspec.json.Encoder().encode
+    return lambda value: encode(value).decode()
+
+
+JSON_BACKENDS: dict[str, Callable[[], JSONEncoder]] = {
+    "json": _stdlib_encoder,
+    "orjson": _orjson_encoder,
+    "msgspec": _msgspec_encoder,
+}
+
+AUTO_BACKEND_ORDER = ("orjson", "msgspec", "json")
+
+
+def get_json_encoder(name: str) -> JSONEncoder:
+    """Return a ``value -> str`` JSON encoder for a backend name.
+
+    Args:
+        name (str): "json" (standard library), "orjson", "msgspec" or "auto" for the
+            fastest installed backend.
+
+    Raises:
+        ValueError: unknown backend name.
+        ImportError: the requested backend is not installed.
+    """
+    if name == "auto":
+        for backend in AUTO_BACKEND_ORDER:
+            try:
+                return JSON_BACKENDS[backend]()
+            except ImportError:
+                continue
+    if name not in JSON_BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend {name!r}, expected one of {sorted(JSON_BACKENDS)} or 'auto'"
+        )
+    return JSON_BACKENDS[name]()
@@ -0,0 +1,114 @@
+"""Flask routes serving the AsyncAPI document and the agent schema."""
+import gzip
+import hashlib
+from typing import Callable, Dict, NamedTuple, Optional
+
+import flask
+from flask import Flask
+
+try:
+    import brotli  # type: ignore[import]
+except ImportError:  # pragma: no cover
+    brotli = None
+
+from sio_asyncapi.asyncapi.docs import AsyncAPIDoc
+
+
+class EncodedSpec(NamedTuple):
+    """A spec body with its precompressed variants and their strong ETags."""
+
+    bodies: Dict[str, bytes]
+    etags: Dict[str, str]
+
+
+def encode_spec(text: str) -> EncodedSpec:
+    """Encode a spec body once per encoding: "identity", "gzip" and "br" if brotli is installed."""
+    body = text.encode()
+    bodies = {"identity": body, "gzip": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    etags = {
+        encoding: digest if encoding == "identity" else f"{digest}-{encoding}"
+        for encoding in bodies
+    }
+    return EncodedSpec(bodies, etags)
+
+
+SPEC_ROUTES: Dict[str, tuple[str, str, Callable[[AsyncAPIDoc], str]]] = {
+    "asyncapi.yaml": ("sio_asyncapi_spec_yaml", "application/yaml", AsyncAPIDoc.get_yaml),
+    "asyncapi.json": ("sio_asyncapi_spec_json", "application/json", AsyncAPIDoc.json),
+    "agent-schema.json": (
+        "sio_asyncapi_agent_schema",
+        "application/json",
+        AsyncAPIDoc.get_agent_schema_json,
+    ),
+}
+
+
+def _preferred_encoding(spec: EncodedSpec) -> str:
+    accept = flask.request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in spec.bodies and accept[encoding] > 0:
+            return encoding
+    return "identity"
+
+
+def register_spec_routes(
+    app: Flask,
+    get_doc: Callable[[], AsyncAPIDoc],
+    url_prefix: str = "",
+) -> None:
+    """Register ``/asyncapi.yaml``, ``/asyncapi.json`` and ``/agent-schema.json`` on a Flask app.
+
+    Bodies are encoded and compressed once per document generation and answered
+    with a strong ETag; requests with a matching ``If-None-Match`` get a 304.
+
+    Args:
+        app (Flask): flask app
+        get_doc (Callable[[], AsyncAPIDoc]): returns the document to serve
+        url_prefix (str, optional): prefix of the routes, e.g. "/docs". Defaults to "".
+    """
+    for filename, (endpoint, mimetype, export) in SPEC_ROUTES.items():
+        if endpoint in app.view_functions:
+            continue
+        app.add_url_rule(
+            f"{url_prefix.rstrip('/')}/{filename}",
+            endpoint,
+            _spec_view(get_doc, mimetype, export),
+        )
+
+
+def _spec_view(
+    get_doc: Callable[[], AsyncAPIDoc],
+    mimetype: str,
+    export: Callable[[AsyncAPIDoc], str],
+):
+    # (document, generation, encoded body) of the last export served by this route
+    encoded: Optional[tuple[AsyncAPIDoc, int, EncodedSpec]] = None
+
+    def view() -> flask.Response:
+        nonlocal encoded
+        doc = get_doc()
+        # read before exporting, so a concurrent mutation leaves the entry stale
+        generation = doc.generation
+        entry = encoded
+        if entry is None or entry[0] is not doc or entry[1] != generation:
+            entry = encoded = (doc, generation, encode_spec(export(doc)))
+        spec = entry[2]
+        encoding = _preferred_encoding(spec)
+        etag = spec.etags[encoding]
+
+        body: Optional[bytes] = spec.bodies[encoding]
+        status = 200
+        if flask.request.if_none_match.contains(etag):
+            body, status = None, 304
+        response = flask.Response(body, status=status, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity" and status == 200:
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+    return view
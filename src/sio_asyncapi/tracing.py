@@ -0,0 +1,232 @@
+"""Local tracing spans around the processing phases of events and emits."""
+import abc
+import atexit
+import collections
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Span of the code being run; _UNSAMPLED inside a trace left out by sampling.
+_UNSAMPLED = object()
+_current_span: contextvars.ContextVar[Any] = contextvars.ContextVar("sio_asyncapi_span", default=None)
+
+
+class Span:
+    """A timed operation of a trace, e.g. the handler call of an event."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time_ns", "duration_ns",
+                 "attributes", "error", "_start")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.duration_ns = 0
+        self._start = time.perf_counter_ns()
+
+    def finish(self) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_ns": self.start_time_ns,
+            "duration_ns": self.duration_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, duration_ns={self.duration_ns}, attributes={self.attributes!r})"
+
+
+class SpanExporter(abc.ABC):
+    """Receives every finished span; subclasses implement :meth:`export`."""
+
+    @abc.abstractmethod
+    def export(self, span: Span) -> None:
+        """Record a finished span."""
+
+    def shutdown(self) -> None:
+        """Flush and release resources."""
+
+
+class RingBufferExporter(SpanExporter):
+    """Keep the last ``capacity`` finished spans in memory."""
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self._spans: "collections.deque[Span]" = collections.deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        """Return the buffered spans, oldest first."""
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class JsonLinesExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line.
+
+    The file is flushed by :meth:`flush`, :meth:`shutdown` and at interpreter exit.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class _SpanContext:
+    """Context manager opening a span, or none when the trace is not sampled."""
+
+    __slots__ = ("tracer", "name", "attributes", "get_attributes", "span", "token")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        attributes: Dict[str, Any],
+        get_attributes: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.get_attributes = get_attributes
+
+    def __enter__(self) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is _UNSAMPLED or (parent is None and not self.tracer.sampled()):
+            self.span = None
+            self.token = _current_span.set(_UNSAMPLED)
+            return None
+        attributes = self.attributes
+        if self.get_attributes is not None:
+            attributes = {**attributes, **self.get_attributes()}
+        self.span = Span(self.name, parent, attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        _current_span.reset(self.token)
+        span = self.span
+        if span is None:
+            return
+        span.finish()
+        if exc is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.exporter.export(span)
+
+
+class Tracer:
+    """Open nested spans and hand the finished ones to an exporter.
+
+    Spans opened while another one is active (in the same thread, greenlet or
+    asyncio task) are its children. ``sample_rate`` is applied to the root spans:
+    the spans nested in a root left out are skipped as well.
+
+    Example::
+        tracer = Tracer(JsonLinesExporter("/var/log/app/spans.jsonl"), sample_rate=0.01)
+        socketio = AsyncAPISocketIO(app, tracer=tracer)
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, *, sample_rate: float = 1.0) -> None:
+        """Create a tracer
+
+        Args:
+            exporter (Optional[SpanExporter], optional): receives the finished spans.
+                Defaults to a RingBufferExporter.
+            sample_rate (float, optional): fraction (0..1) of the traces recorded.
+                Defaults to 1.0.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.exporter = exporter if exporter is not None else RingBufferExporter()
+        self.sample_rate = sample_rate
+
+    def sampled(self) -> bool:
+        """Decide whether a new trace is recorded."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def span(self, name: str, **attributes: Any) -> _SpanContext:
+        """Return a context manager timing its block in a span, e.g. ``with tracer.span("db"):``."""
+        return _SpanContext(self, name, attributes)
+
+    def traced(
+        self,
+        name: str,
+        func: Callable,
+        attributes: Optional[Dict[str, Any]] = None,
+        get_attributes: Optional[Callable[[tuple, dict], Dict[str, Any]]] = None,
+    ) -> Callable:
+        """Wrap ``func`` to run each call in a span.
+
+        Args:
+            name (str): span name
+            func (Callable): function to wrap
+            attributes (Optional[Dict[str, Any]], optional): attributes of every span.
+                Defaults to None.
+            get_attributes (Optional[Callable[[tuple, dict], Dict[str, Any]]], optional):
+                returns the attributes of a call from its arguments, only called for
+                the spans recorded. Defaults to None.
+        """
+        attributes = attributes or {}
+
+        def traced_func(*args, **kwargs):
+            call_attributes = None
+            if get_attributes is not None:
+                call_attributes = functools.partial(get_attributes, args, kwargs)
+            with _SpanContext(self, name, attributes, call_attributes):
+                return func(*args, **kwargs)
+
+        return traced_func
+
+    def traced_async(
+        self,
+        name: str,
+        func: Callable,
+        attributes: Optional[Dict[str, Any]] = None,
+        get_attributes: Optional[Callable[[tuple, dict], Dict[str, Any]]] = None,
+    ) -> Callable:
+        """Coroutine version of :meth:`traced`."""
+        attributes = attributes or {}
+
+        async def traced_func(*args, **kwargs):
+            call_attributes = None
+            if get_attributes is not None:
+                call_attributes = functools.partial(get_attributes, args, kwargs)
+            with _SpanContext(self, name, attributes, call_attributes):
+                return await func(*args, **kwargs)
+
+        return traced_func
@@ -0,0 +1,121 @@
+"""Validation policies deciding which Socket.IO messages are validated."""
+import random
+import threading
+from typing import Callable, Literal, Optional
+
+ValidationMode = Literal["always", "never", "sample", "first"]
+
+
+class ValidationPolicy:
+    """Decide whether a message is validated and what happens on a violation.
+
+    Example::
+        # validate 5% of the telemetry events and only count the violations
+        policy = ValidationPolicy.sample(0.05, raise_errors=False)
+
+        @socketio.on("telemetry", request_model=Telemetry, validation_policy=policy)
+        def telemetry(request: Telemetry):
+            ...
+
+    When a request is not validated, or fails validation with ``raise_errors=False``,
+    the handler receives a model built with ``model_construct``/``construct``, the
+    nested models included: field values are left as received. A payload that is
+    not an object (e.g. a string) is passed to the handler as received.
+    """
+
+    def __init__(
+        self,
+        mode: ValidationMode = "always",
+        *,
+        rate: float = 1.0,
+        first: int = 0,
+        raise_errors: bool = True,
+        max_tracked_sids: int = 100_000,
+    ) -> None:
+        """Create a validation policy
+
+        Args:
+            mode (ValidationMode, optional): "always", "never", "sample" (validate a
+                ``rate`` fraction of the messages) or "first" (validate the ``first``
+                messages of every sid). Defaults to "always".
+            rate (float, optional): Fraction of the messages validated in "sample" mode.
+                Defaults to 1.0.
+            first (int, optional): Number of messages validated per sid in "first" mode.
+                Defaults to 0.
+            raise_errors (bool, optional): If False violations are only counted and logged.
+                Defaults to True.
+            max_tracked_sids (int, optional): Maximum number of sids remembered in "first"
+                mode; the oldest ones are forgotten first. Defaults to 100_000.
+        """
+        if mode not in ("always", "never", "sample", "first"):
+            raise ValueError(f"Unknown validation mode {mode!r}")
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("rate must be between 0 and 1")
+        if first < 0:
+            raise ValueError("first must be positive")
+        self.mode = mode
+        self.rate = rate
+        self.first = first
+        self.raise_errors = raise_errors
+        self.max_tracked_sids = max_tracked_sids
+        self._seen_per_sid: dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def always(cls, *, raise_errors: bool = True) -> "ValidationPolicy":
+        """Validate every message."""
+        return cls("always", raise_errors=raise_errors)
+
+    @classmethod
+    def never(cls) -> "ValidationPolicy":
+        """Never validate messages."""
+        return cls("never")
+
+    @classmethod
+    def sample(cls, rate: float, *, raise_errors: bool = True) -> "ValidationPolicy":
+        """Validate a random ``rate`` fraction (0..1) of the messages."""
+        return cls("sample", rate=rate, raise_errors=raise_errors)
+
+    @classmethod
+    def first_per_sid(
+        cls,
+        count: int,
+        *,
+        raise_errors: bool = True,
+        max_tracked_sids: int = 100_000,
+    ) -> "ValidationPolicy":
+        """Validate the first ``count`` messages of every client sid."""
+        return cls(
+            "first",
+            first=count,
+            raise_errors=raise_errors,
+            max_tracked_sids=max_tracked_sids,
+        )
+
+    def should_validate(self, get_sid: Callable[[], Optional[str]]) -> bool:
+        """Return True when the current message has to be validated.
+
+        ``get_sid`` is only called by the "first" mode, which tracks messages per sid.
+        """
+        if self.mode == "always":
+            return True
+        if self.mode == "never":
+            return False
+        if self.mode == "sample":
+            return random.random() < self.rate
+
+        sid = get_sid()
+        with self._lock:
+            seen = self._seen_per_sid.get(sid, 0)
+            if seen >= self.first:
+                return False
+            if sid not in self._seen_per_sid and len(self._seen_per_sid) >= self.max_tracked_sids:
+                del self._seen_per_sid[next(iter(self._seen_per_sid))]
+            self._seen_per_sid[sid] = seen + 1
+        return True
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(mode={self.mode!r}, rate={self.rate}, "
+            f"first={self.first}, raise_errors={self.raise_errors})"
+        )
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import tracemalloc
+from typing import List
+
+import pytest
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AllocationTracker, AsyncAPIAsyncServer, AsyncAPISocketIO, MetricsRegistry
+
+
+class Batch(BaseModel):
+    items: List[str]
+
+
+class Summary(BaseModel):
+    count: int
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    yield
+    tracemalloc.stop()
+
+
+def make_server():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, metrics=True)
+
+    @socketio.on("batch", request_model=Batch, response_model=Summary, track_allocations=True)
+    def batch(request: Batch):
+        return Summary(count=len(request.items))
+
+    return app, socketio
+
+
+def test_tracked_event_records_phase_allocations(tmp_path):
+    app, socketio = make_server()
+    client = socketio.test_client(app)
+    payload = {"items": [f"item-{index}" for index in range(5000)]}
+
+    assert json.loads(client.emit("batch", payload, callback=True)) == {"count": 5000}
+
+    stats = {entry["phase"]: entry for entry in socketio.allocation_tracker.snapshot()}
+    assert set(stats) == {"request_validation", "handler", "response_validation", "serialization"}
+    assert stats["request_validation"]["subject"] == "Batch"
+    assert stats["request_validation"]["calls"] == 1
+    assert stats["request_validation"]["peak_bytes_max"] >= 5000 * 8  # the validated list
+    assert stats["handler"]["subject"].endswith("batch")
+
+    histograms = {
+        (histogram["name"], histogram["labels"]["phase"])
+        for histogram in socketio.metrics.collect()["histograms"]
+        if histogram["name"].endswith("allocation_bytes")
+    }
+    assert ("sio_asyncapi_peak_allocation_bytes", "request_validation") in histograms
+    assert ("sio_asyncapi_retained_allocation_bytes", "handler") in histograms
+
+    path = tmp_path / "allocations.json"
+    socketio.allocation_tracker.dump(path)
+    content = json.loads(path.read_text())
+    assert content["traced_memory"]["peak_bytes"] > 0
+    assert {entry["phase"] for entry in content["events"]} == set(stats)
+
+
+def test_untracked_events_are_not_wrapped():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True)
+
+    @socketio.on("batch", request_model=Batch)
+    def batch(request: Batch):
+        return None
+
+    socketio.test_client(app).emit("batch", {"items": []})
+    assert socketio.allocation_tracker is None
+
+
+def test_async_server_uses_the_given_tracker():
+    tracker = AllocationTracker()
+    sio = AsyncAPIAsyncServer(validate=True, allocation_tracker=tracker)
+
+    @sio.on("batch", request_model=Batch, track_allocations=True)
+    async def batch(sid, request: Batch):
+        return len(request.items)
+
+    assert asyncio.run(sio.handlers["/"]["batch"]("sid-1", {"items": ["a", "b"]})) == 2
+    stats = {entry["phase"]: entry for entry in tracker.snapshot()}
+    assert stats["handler"]["calls"] == 1
+    assert stats["request_validation"]["subject"] == "Batch"
+
+
+def test_freed_memory_is_counted_apart_from_retained_memory():
+    registry = MetricsRegistry()
+    tracker = AllocationTracker(metrics=registry)
+    buffers = []
+
+    def allocate():
+        buffers.append(bytearray(100_000))
+
+    def free():
+        buffers.clear()
+
+    tracker.tracked("buffer", "/", "allocate", allocate)()
+    tracker.tracked("buffer", "/", "free", free)()
+
+    retained = {
+        histogram["labels"]["phase"]: histogram
+        for histogram in registry.collect()["histograms"]
+        if histogram["name"] == "sio_asyncapi_retained_allocation_bytes"
+    }
+    assert retained["allocate"]["sum"] >= 90_000
+    assert retained["free"]["sum"] == 0
+    freed = {
+        counter["labels"]["phase"]: counter["value"]
+        for counter in registry.collect()["counters"]
+        if counter["name"] == "sio_asyncapi_freed_allocation_bytes_total"
+    }
+    assert freed["free"] >= 90_000
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+import socketio
+from pydantic import BaseModel
+
+from sio_asyncapi import (AsyncAPIAsyncServer, EmitValidationError,
+                          RequestValidationError, ResponseValidationError)
+
+
+class EchoRequest(BaseModel):
+    text: str
+    times: int = 1
+
+
+class EchoResponse(BaseModel):
+    text: str
+
+
+def make_server(**kwargs) -> AsyncAPIAsyncServer:
+    return AsyncAPIAsyncServer(async_mode="asgi", validate=True, **kwargs)
+
+
+def test_async_handler_is_validated_and_documented():
+    sio = make_server()
+
+    @sio.on("echo", get_from_typehint=True)
+    async def echo(sid, request: EchoRequest) -> EchoResponse:
+        """Echo the text back"""
+        assert sid == "sid-1"
+        return EchoResponse(text=request.text * request.times)
+
+    ack = asyncio.run(sio._trigger_event("echo", "/", "sid-1", {"text": "ab", "times": 2}))
+    assert json.loads(ack) == {"text": "abab"}
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(echo("sid-1", {"times": 2}))
+
+    doc = sio.asyncapi_doc.dict()
+    assert doc["components"]["messages"]["Echo"]["payload"] == {
+        "$ref": "#/components/schemas/EchoRequest"
+    }
+    assert doc["components"]["messages"]["Echo"]["x-ack"] == {
+        "$ref": "#/components/schemas/EchoResponse"
+    }
+    assert doc["operations"]["receive_echo"]["description"] == "Echo the text back"
+
+
+def test_sync_handler_and_response_validation():
+    sio = make_server()
+
+    def broken(sid, data):
+        return {"unexpected": True}
+
+    sio.on("broken", broken, response_model=EchoResponse)
+
+    with pytest.raises(ResponseValidationError):
+        asyncio.run(sio._trigger_event("broken", "/", "sid-1", {}))
+
+
+def test_emit_is_validated_before_reaching_the_manager(monkeypatch):
+    sio = make_server()
+    sent = []
+
+    async def fake_emit(self, event, data=None, **kwargs):
+        sent.append((event, data, kwargs["to"]))
+
+    monkeypatch.setattr(socketio.AsyncServer, "emit", fake_emit)
+
+    @sio.doc_emit("echoed", EchoResponse)
+    def register_emit():
+        return None
+
+    asyncio.run(sio.emit("echoed", EchoResponse(text="hi"), to="sid-1"))
+    assert sent == [("echoed", {"text": "hi"}, "sid-1")]
+
+    with pytest.raises(EmitValidationError):
+        asyncio.run(sio.emit("echoed", {"message": "hi"}))
+
+
+def test_emit_policies_count_the_sid_being_served():
+    from sio_asyncapi import ValidationPolicy
+
+    sio = make_server()
+    sio.doc_emit("echoed", EchoResponse, validation_policy=ValidationPolicy.first_per_sid(1))(lambda: None)
+
+    @sio.on("shout")
+    async def shout(sid, data):
+        await sio.emit("echoed", {"unexpected": True})
+
+    for sid in ("sid-1", "sid-2"):
+        with pytest.raises(EmitValidationError):
+            asyncio.run(sio._trigger_event("shout", "/", sid, {}))
+    asyncio.run(sio._trigger_event("shout", "/", "sid-1", {}))
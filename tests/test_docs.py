@@ -3,13 +3,14 @@ import pathlib
 import shutil
 from subprocess import check_call
 
+import pytest
 from flask import Flask
 from pydantic import BaseModel
 
 from sio_asyncapi.asyncapi.docs import AsyncAPIDoc
 from sio_asyncapi.application import AsyncAPISocketIO
 
-from .fixtures import socketio
+from .fixtures import DownloadAccepted, socketio
 
 
 def get_doc_dict():
@@ -213,3 +214,262 @@ def test_agent_schema_json_matches_dict_export():
     agent_schema_json = socketio.get_agent_schema_json()
 
     assert json.loads(agent_schema_json) == agent_schema
+
+
+def test_exports_are_memoized_until_the_next_mutation():
+    doc = AsyncAPIDoc.default_init()
+    doc.add_new_sender("first_event")
+    generation = doc.generation
+
+    assert doc._document() is doc._document()
+    assert doc.dict() is not doc.dict()
+    assert doc.json() is doc.json()
+    assert doc.get_yaml() is doc.get_yaml()
+    assert doc.json(indent=2) is doc.json(indent=2)
+    assert doc.json(indent=2) != doc.json()
+
+    doc.add_new_sender("second_event")
+    assert doc.generation > generation
+    assert "send_second_event" in doc.dict()["operations"]
+    assert "send_second_event" in json.loads(doc.json())["operations"]
+    assert "second_event" in doc.get_yaml()
+
+    doc.info["title"] = "Renamed"
+    assert doc.dict()["info"]["title"] != "Renamed"
+    doc.invalidate()
+    assert doc.dict()["info"]["title"] == "Renamed"
+
+    exported = doc.dict()
+    exported["operations"].clear()
+    catalog = doc.get_agent_schema()
+    catalog["events"].clear()
+    assert "send_second_event" in json.loads(doc.json())["operations"]
+    assert "send_second_event" in doc.get_yaml()
+    assert json.loads(doc.get_agent_schema_json())["events"]
+
+
+
+def test_document_view_is_read_only_and_shared_until_the_next_mutation():
+    doc = AsyncAPIDoc.default_init()
+    doc.add_new_sender("first_event")
+
+    view = doc.document_view()
+    assert view is doc.document_view()
+    assert dict(view["operations"]).keys() == doc.dict()["operations"].keys()
+    with pytest.raises(TypeError):
+        view["operations"]["send_first_event"]["messages"] = []  # type: ignore[index]
+    assert isinstance(view["operations"]["send_first_event"]["messages"], tuple)
+
+    doc.add_new_sender("second_event")
+    assert doc.document_view() is not view
+    assert "send_second_event" in doc.document_view()["operations"]
+    assert "send_second_event" not in view["operations"]
+
+
+def test_agent_schema_view_is_read_only_and_shared_until_the_next_mutation():
+    doc = AsyncAPIDoc.default_init()
+    doc.add_new_sender("first_event")
+
+    view = doc.agent_schema_view()
+    assert view is doc.agent_schema_view()
+    assert isinstance(view["events"], tuple)
+    assert [event["name"] for event in view["events"]] == ["first_event"]
+    with pytest.raises(TypeError):
+        view["events"][0]["name"] = "renamed"  # type: ignore[index]
+    assert json.loads(doc.get_agent_schema_json())["events"][0]["name"] == "first_event"
+
+    doc.add_new_sender("second_event")
+    assert doc.agent_schema_view() is not view
+    assert [event["name"] for event in doc.agent_schema_view()["events"]] == [
+        "first_event",
+        "second_event",
+    ]
+
+def test_ref_resolver_shares_components_and_stops_at_cycles():
+    from sio_asyncapi.asyncapi.resolver import RefResolver
+
+    resolver = RefResolver({
+        "components": {
+            "schemas": {
+                "Leaf": {"type": "string"},
+                "Pair": {"properties": {"a": {"$ref": "#/components/schemas/Leaf"}}},
+                "Tree": {"properties": {"child": {"$ref": "#/components/schemas/Tree"}}},
+            }
+        }
+    })
+    first = resolver.resolve({"$ref": "#/components/schemas/Pair"})
+    second = resolver.resolve({"$ref": "#/components/schemas/Pair", "description": "x"})
+    assert first["properties"]["a"] == {"type": "string", "x-component-ref": "#/components/schemas/Leaf"}
+    assert second["properties"]["a"] is first["properties"]["a"]
+    assert second["description"] == "x"
+
+    tree = resolver.resolve({"$ref": "#/components/schemas/Tree"})
+    assert tree["properties"]["child"] == {"$ref": "#/components/schemas/Tree"}
+    assert resolver.resolve({"$ref": "#/components/schemas/Missing"}) == {
+        "$ref": "#/components/schemas/Missing"
+    }
+
+
+def test_agent_catalog_only_rebuilds_affected_entries():
+    class Shared(BaseModel):
+        value: int
+
+    class Other(BaseModel):
+        text: str
+
+    def handler():
+        """Handle"""
+
+    doc = AsyncAPIDoc.default_init()
+    doc.add_new_receiver(handler, "first", payload_model=Shared)
+    doc.add_new_sender("second", Other)
+    events = {event["name"]: event for event in doc._agent_schema()["events"]}
+    assert doc.get_agent_schema_json() is doc.get_agent_schema_json()
+
+    doc.add_new_sender("third", Other)
+    rebuilt = {event["name"]: event for event in doc._agent_schema()["events"]}
+    assert rebuilt["first"] is events["first"]
+    assert rebuilt["second"] is events["second"]
+    assert "third" in rebuilt
+
+    class Shared(BaseModel):  # noqa: F811 - redefined, e.g. on hot reload
+        value: str
+
+    doc.add_new_sender("fourth", Shared)
+    rebuilt = {event["name"]: event for event in doc._agent_schema()["events"]}
+    assert rebuilt["first"] is not events["first"]
+    assert rebuilt["first"]["input_schema"]["properties"]["value"]["type"] == "string"
+    assert rebuilt["second"] is events["second"]
+
+
+def test_model_schemas_are_cached_per_process(monkeypatch):
+    from sio_asyncapi._compat import get_model_adapter
+    from sio_asyncapi.asyncapi.schema_cache import clear_schema_cache
+
+    class Cached(BaseModel):
+        value: int
+
+    adapter = get_model_adapter(Cached)
+    calls = []
+    schema = adapter.schema
+    monkeypatch.setattr(adapter, "schema", lambda: calls.append(1) or schema())
+
+    first_doc = AsyncAPIDoc.default_init()
+    second_doc = AsyncAPIDoc.default_init()
+    for index in range(3):
+        first_doc.add_new_sender(f"cached_{index}", Cached)
+        second_doc.add_new_sender(f"cached_{index}", Cached)
+    assert len(calls) == 1
+    assert first_doc.components["schemas"]["Cached"] == second_doc.components["schemas"]["Cached"]
+    # the components are copies: editing one document leaves the cache and the others alone
+    first_doc.components["schemas"]["Cached"]["title"] = "Edited"
+    first_doc.invalidate()
+    assert second_doc.components["schemas"]["Cached"]["title"] == "Cached"
+    third_doc = AsyncAPIDoc.default_init()
+    third_doc.add_new_sender("cached", Cached)
+    assert third_doc.components["schemas"]["Cached"]["title"] == "Cached"
+
+    clear_schema_cache()
+    second_doc.add_new_sender("after_clear", Cached)
+    assert len(calls) == 2
+
+    class Cached(BaseModel):  # noqa: F811 - redefined, e.g. on hot reload
+        value: str
+
+    first_doc.add_new_sender("redefined", Cached)
+    assert first_doc.components["schemas"]["Cached"]["properties"]["value"]["type"] == "string"
+
+
+def test_models_with_the_same_name_get_distinct_components():
+    def handler():
+        """Handle"""
+
+    def make_model(kind):
+        class Item(BaseModel):
+            value: kind
+
+        Item.__qualname__ = f"{kind.__name__}.Item"
+        return Item
+
+    IntItem, StrItem = make_model(int), make_model(str)
+
+    doc = AsyncAPIDoc.default_init()
+    doc.add_new_receiver(handler, "ints", payload_model=IntItem)
+    doc.add_new_receiver(handler, "strings", payload_model=StrItem)
+    doc.add_new_sender("more_ints", IntItem)
+
+    schemas = doc.dict()["components"]["schemas"]
+    assert schemas["Item"]["properties"]["value"]["type"] == "integer"
+    assert schemas["str.Item"]["properties"]["value"]["type"] == "string"
+    assert doc.components["messages"]["Strings"]["payload"] == {"$ref": "#/components/schemas/str.Item"}
+    assert doc.components["messages"]["more_ints"]["payload"] == {"$ref": "#/components/schemas/Item"}
+
+
+def test_hoisted_definitions_are_shared_components():
+    class Address(BaseModel):
+        city: str
+
+    class Customer(BaseModel):
+        address: Address
+
+    class Order(BaseModel):
+        customer: Customer
+        shipping: Address
+
+    class Data(BaseModel):
+        unrelated: int
+
+    def handler():
+        """Handle"""
+
+    doc = AsyncAPIDoc.default_init(hoist_definitions=True)
+    doc.add_new_receiver(handler, "order", payload_model=Order, ack_data_model=Customer)
+    doc.add_new_sender("data", Data)
+    doc.add_new_sender("accepted", DownloadAccepted)
+
+    schemas = doc.dict()["components"]["schemas"]
+    assert "$defs" not in schemas["Order"] and "definitions" not in schemas["Order"]
+    assert schemas["Order"]["properties"]["shipping"] == {"$ref": "#/components/schemas/Address"}
+    assert schemas["Customer"]["properties"]["address"] == {"$ref": "#/components/schemas/Address"}
+    assert schemas["Data"]["properties"]["unrelated"]["type"] == "integer"
+    assert schemas["DownloadAccepted"]["properties"]["data"] == {
+        "$ref": "#/components/schemas/DownloadAccepted.Data"
+    }
+    assert "is_accepted" in schemas["DownloadAccepted.Data"]["properties"]
+
+    events = {event["name"]: event for event in doc.get_agent_schema()["events"]}
+    customer = events["order"]["input_schema"]["properties"]["customer"]
+    assert customer["properties"]["address"]["properties"]["city"]["type"] == "string"
+
+
+def test_streaming_exports_match_the_document():
+    import io
+
+    import yaml
+
+    doc = socketio.asyncapi_doc
+    yaml_stream, json_stream = io.StringIO(), io.StringIO()
+    doc.write_yaml(yaml_stream)
+    doc.write_json(json_stream)
+
+    assert yaml.safe_load(yaml_stream.getvalue()) == doc.dict()
+    assert json_stream.getvalue() == doc.json()
+
+    empty = AsyncAPIDoc.default_init()
+    json_stream = io.StringIO()
+    empty.write_json(json_stream)
+    assert json_stream.getvalue() == empty.json()
+
+
+def test_yaml_exports_keep_the_safe_dump_output():
+    import io
+
+    import yaml
+
+    doc = AsyncAPIDoc.default_init(title="Café API")
+    assert doc.get_yaml() == yaml.safe_dump(doc.dict(), sort_keys=False)
+    assert "Caf\\xE9 API" in doc.get_yaml()
+
+    yaml_stream = io.StringIO()
+    doc.write_yaml(yaml_stream)
+    assert yaml_stream.getvalue() == doc.get_yaml()
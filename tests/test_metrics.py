@@ -0,0 +1,144 @@
+import json
+import threading
+
+import pytest
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPISocketIO, MetricsRegistry
+
+
+class Ping(BaseModel):
+    count: int
+
+
+class Pong(BaseModel):
+    count: int
+
+
+def make_server(**kwargs):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, **kwargs)
+
+    @socketio.on("ping", request_model=Ping, response_model=Pong)
+    def ping(request: Ping):
+        return Pong(count=request.count + 1)
+
+    @socketio.on_error_default
+    def error_handler(e):
+        return {"error": str(e)}
+
+    @socketio.doc_emit("pong", Pong)
+    def pong():
+        pass
+
+    return app, socketio
+
+
+def durations(registry: MetricsRegistry, event: str) -> dict:
+    return {
+        sample["labels"]["phase"]: sample["count"]
+        for sample in registry.collect()["histograms"]
+        if sample["labels"]["event"] == event
+    }
+
+
+def test_histogram_buckets_are_merged_across_threads():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    histogram = registry.histogram("latency", (("event", "ping"),))
+    counter = registry.counter("calls")
+
+    def observe():
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+            counter.inc()
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 12
+    assert snapshot["sum"] == pytest.approx(4 * 5.55)
+    assert list(snapshot["buckets"].values()) == [4, 8, 12]
+    assert counter.value == 12
+    # the shards of the finished threads are merged into the totals
+    assert not counter._shards and not histogram._shards
+
+
+def test_handled_events_and_emits_are_timed_per_phase():
+    app, socketio = make_server(metrics=True)
+    client = socketio.test_client(app)
+
+    assert json.loads(client.emit("ping", {"count": 1}, callback=True)) == {"count": 2}
+    client.emit("ping", {"count": "not a number"}, callback=True)
+    socketio.emit("pong", {"count": 3})
+
+    registry = socketio.metrics
+    assert isinstance(registry, MetricsRegistry)
+    assert durations(registry, "ping") == {
+        "request_validation": 2,
+        "handler": 1,
+        "response_validation": 1,
+        "serialization": 1,
+    }
+    assert durations(registry, "pong") == {"emit_validation": 1}
+    errors = {
+        (sample["labels"]["event"], sample["labels"].get("phase")): sample["value"]
+        for sample in registry.collect()["counters"]
+    }
+    assert errors[("ping", "request_validation")] == 1
+    assert errors[("pong", None)] == 1
+
+
+def test_emit_phases_are_instrumented_once(monkeypatch):
+    app, socketio = make_server(metrics=True)
+    instrumented = []
+    instrument = socketio._instrument
+
+    def counting_instrument(phase, *args, **kwargs):
+        instrumented.append(phase)
+        return instrument(phase, *args, **kwargs)
+
+    monkeypatch.setattr(socketio, "_instrument", counting_instrument)
+    for count in range(3):
+        socketio.emit("pong", Pong(count=count))
+        socketio.emit("pong", {"count": count})
+
+    assert instrumented == ["emit_serialization", "emit_validation"]
+    assert isinstance(socketio.metrics, MetricsRegistry)
+    assert durations(socketio.metrics, "pong") == {"emit_validation": 3, "emit_serialization": 3}
+
+
+def test_metrics_are_disabled_by_default():
+    app, socketio = make_server()
+    client = socketio.test_client(app)
+
+    assert socketio.metrics is None
+    assert json.loads(client.emit("ping", {"count": 1}, callback=True)) == {"count": 2}
+
+
+def test_metrics_route_renders_prometheus_text():
+    app, socketio = make_server(metrics_url="/metrics")
+    client = socketio.test_client(app)
+    client.emit("ping", {"count": 1}, callback=True)
+
+    response = app.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert "# TYPE sio_asyncapi_phase_duration_seconds histogram" in text
+    assert (
+        'sio_asyncapi_phase_duration_seconds_count{event="ping",namespace="/",phase="handler"} 1'
+        in text
+    )
+    assert 'sio_asyncapi_phase_duration_seconds_bucket{event="ping",namespace="/",phase="handler",le="+Inf"} 1' in text
+
+
+def test_metrics_route_is_registered_once():
+    app, socketio = make_server(metrics_url="/metrics")
+    socketio.init_app(app)
+
+    assert app.test_client().get("/metrics").status_code == 200
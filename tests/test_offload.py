@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+from pydantic import BaseModel, ValidationError
+
+try:
+    from pydantic import field_validator
+except ImportError:  # pydantic v1
+    from pydantic import validator as field_validator
+
+from sio_asyncapi import (AsyncAPIAsyncServer, AsyncAPISocketIO,
+                          RequestValidationError, ValidationOffload)
+from sio_asyncapi.offload import estimate_payload_size
+
+validated_in: list = []
+
+
+class Batch(BaseModel):
+    items: list[str]
+
+    @field_validator("items")
+    def record_thread(cls, items):
+        validated_in.append(threading.current_thread().name)
+        return items
+
+
+def big_batch() -> dict:
+    return {"items": ["x" * 100] * 20}
+
+
+def make_offload(**kwargs) -> ValidationOffload:
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="offload-test")
+    return ValidationOffload(executor, min_payload_size=1_000, **kwargs)
+
+
+def setup_function():
+    validated_in.clear()
+
+
+def test_estimate_payload_size_stops_at_limit():
+    assert estimate_payload_size({"a": "xyz", "b": [1, 2]}) == 2 + 1 + 3 + 1 + 2 + 16
+    nested = [["x" * 10] * 10] * 10
+    assert estimate_payload_size(nested) == 1_110
+    assert estimate_payload_size(nested, limit=50) < 100
+
+
+def test_large_requests_are_validated_in_the_executor():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, validation_offload=make_offload())
+
+    @socketio.on("batch", request_model=Batch)
+    def handle_batch(request):
+        assert isinstance(request, Batch)
+        return len(request.items)
+
+    assert handle_batch(big_batch()) == 20
+    assert handle_batch({"items": ["small"]}) == 1
+    assert validated_in[0].startswith("offload-test")
+    assert validated_in[1] == threading.current_thread().name
+
+    with pytest.raises(RequestValidationError):
+        handle_batch({"items": [["x" * 2_000]]})
+
+
+def test_offload_is_per_event_and_per_model():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+    offload = make_offload(models=[Batch])
+
+    @socketio.on("offloaded", request_model=Batch, validation_offload=offload)
+    def offloaded(request):
+        return None
+
+    @socketio.on("inline", request_model=Batch)
+    def inline(request):
+        return None
+
+    offloaded(big_batch())
+    inline(big_batch())
+    assert validated_in[0].startswith("offload-test")
+    assert validated_in[1] == threading.current_thread().name
+    assert not offload.should_offload(dict, big_batch())
+
+
+def test_full_queue_validates_inline():
+    offload = make_offload(max_pending=1)
+    offload._slots.acquire()
+    try:
+        assert isinstance(offload.validate(Batch, big_batch()), Batch)
+    finally:
+        offload._slots.release()
+    assert validated_in == [threading.current_thread().name]
+
+
+def test_async_server_awaits_offloaded_validation():
+    sio = AsyncAPIAsyncServer(async_mode="asgi", validate=True, validation_offload=make_offload())
+
+    @sio.on("batch", request_model=Batch)
+    async def handle_batch(sid, request):
+        return len(request.items)
+
+    assert asyncio.run(sio._trigger_event("batch", "/", "sid-1", big_batch())) == 20
+    assert validated_in[0].startswith("offload-test")
+    with pytest.raises(RequestValidationError):
+        asyncio.run(handle_batch("sid-1", {"items": [["x" * 2_000]]}))
+
+
+def test_without_executor_sync_validation_runs_inline_and_async_in_the_loop_pool():
+    offload = ValidationOffload(min_payload_size=1_000)
+
+    assert isinstance(offload.validate(Batch, big_batch()), Batch)
+    assert validated_in == [threading.current_thread().name]
+
+    assert isinstance(asyncio.run(offload.validate_async(Batch, big_batch())), Batch)
+    assert validated_in[1] != threading.current_thread().name
+
+
+def test_without_executor_green_servers_use_the_hub_thread_pool(monkeypatch):
+    from sio_asyncapi import offload as offload_module
+
+    calls = []
+
+    def run(func, *args):
+        calls.append(func)
+        return func(*args)
+
+    monkeypatch.setattr(offload_module, "green_threadpool", lambda: run)
+    offload = ValidationOffload(min_payload_size=1_000)
+
+    assert isinstance(offload.validate(Batch, big_batch()), Batch)
+    assert len(calls) == 1
+    with pytest.raises(ValidationError):
+        offload.validate(Batch, {"items": [["x"]]})
@@ -0,0 +1,87 @@
+import asyncio
+import pstats
+import time
+
+import pytest
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPIAsyncServer, AsyncAPISocketIO
+
+
+class Job(BaseModel):
+    size: int
+
+
+def make_server():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True)
+
+    @socketio.on("work", request_model=Job)
+    def work(request: Job):
+        busy_work(request.size)
+
+    return app, socketio
+
+
+def busy_work(milliseconds: float):
+    end = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def test_cprofile_session_writes_pstats_after_n_calls(tmp_path):
+    app, socketio = make_server()
+    client = socketio.test_client(app)
+    session = socketio.profile_event("work", calls=2, output_dir=tmp_path)
+
+    with pytest.raises(ValueError):
+        socketio.profile_event("work", calls=1, output_dir=tmp_path)
+    for _ in range(3):
+        client.emit("work", {"size": 1})
+
+    (path,) = session.wait(timeout=5)
+    assert session.calls == 2
+    assert path.suffix == ".pstats"
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "busy_work" in functions
+    assert socketio._profile_sessions == {}
+
+
+def test_sampling_session_writes_collapsed_stacks(tmp_path):
+    app, socketio = make_server()
+    client = socketio.test_client(app)
+    session = socketio.profile_event("work", seconds=0.5, mode="sampling", interval=0.001, output_dir=tmp_path)
+
+    client.emit("work", {"size": 100})
+    (path,) = session.wait(timeout=5)
+    assert path.suffix == ".collapsed"
+    lines = path.read_text().splitlines()
+    assert any("busy_work" in line.rsplit(" ", 1)[0] for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_session_is_unregistered_when_results_cannot_be_written(tmp_path):
+    app, socketio = make_server()
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    session = socketio.profile_event("work", seconds=60, output_dir=blocker / "profiles")
+
+    with pytest.raises(OSError):
+        session.stop()
+    assert session.done.is_set()
+    assert socketio._profile_sessions == {}
+    socketio.profile_event("work", calls=1, output_dir=tmp_path).stop()
+
+
+def test_coroutine_handlers_can_be_profiled(tmp_path):
+    sio = AsyncAPIAsyncServer(async_mode="asgi", validate=True)
+
+    @sio.on("work", request_model=Job)
+    async def work(sid, request: Job):
+        busy_work(request.size)
+
+    session = sio.profile_event("work", calls=1, output_dir=tmp_path)
+    asyncio.run(sio.handlers["/"]["work"]("sid-1", {"size": 1}))
+    (path,) = session.wait(timeout=5)
+    assert "busy_work" in {name for _, _, name in pstats.Stats(str(path)).stats}
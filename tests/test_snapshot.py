@@ -0,0 +1,104 @@
+import json
+
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPISocketIO
+from sio_asyncapi._compat import get_model_adapter
+from sio_asyncapi.asyncapi import snapshot
+from sio_asyncapi.asyncapi.schema_cache import clear_schema_cache
+from sio_asyncapi.asyncapi.snapshot import model_fingerprint
+
+
+class SnapshotItem(BaseModel):
+    name: str
+
+
+class SnapshotRequest(BaseModel):
+    items: list[SnapshotItem]
+
+
+def make_socketio(path) -> AsyncAPISocketIO:
+    socketio = AsyncAPISocketIO(Flask(__name__), spec_snapshot=path)
+
+    @socketio.on("snapshot_request", request_model=SnapshotRequest, response_model=SnapshotItem)
+    def handle(request):
+        """Handle a request"""
+
+    return socketio
+
+
+def test_snapshot_schemas_are_loaded_by_later_processes(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot.json"
+    clear_schema_cache()
+    socketio = make_socketio(path)
+    first = socketio.asyncapi_doc.dict()
+    socketio.asyncapi_doc.json()
+    assert not path.exists()
+
+    socketio.materialize_docs()
+    content = json.loads(path.read_text())
+    assert len(content["schemas"]) == 2
+    assert content["document"]["content"] == first
+
+    clear_schema_cache()
+    for model in (SnapshotRequest, SnapshotItem):
+        monkeypatch.setattr(get_model_adapter(model), "schema", lambda: 1 / 0)
+    socketio = make_socketio(path)
+    assert socketio.asyncapi_doc.dict() == first
+    assert socketio.asyncapi_doc.registration_hash() == content["document"]["registration_hash"]
+
+
+def test_model_fingerprint_follows_sources(monkeypatch):
+    class LocalModel(BaseModel):
+        value: int
+
+    fingerprint = model_fingerprint(SnapshotRequest)
+    assert fingerprint == model_fingerprint(SnapshotRequest)
+    assert model_fingerprint(LocalModel) is None
+
+    monkeypatch.setattr(snapshot, "_FINGERPRINTS", snapshot.weakref.WeakKeyDictionary())
+    monkeypatch.setattr(snapshot, "_source_stamp", lambda module: f"{module}:changed")
+    assert model_fingerprint(SnapshotRequest) != fingerprint
+
+
+def test_lazy_docs_are_built_on_first_access():
+    socketio = AsyncAPISocketIO(Flask(__name__), lazy_docs=True)
+
+    @socketio.on("lazy_event", request_model=SnapshotRequest)
+    def handle(request):
+        """Lazy handler"""
+
+    @socketio.doc_emit("lazy_emit", SnapshotItem)
+    def emit():
+        pass
+
+    assert socketio._asyncapi_doc is None
+    doc = socketio.asyncapi_doc.dict()
+    assert "receive_lazy_event" in doc["operations"]
+    assert "send_lazy_emit" in doc["operations"]
+
+    @socketio.on("after_materialization")
+    def after():
+        pass
+
+    assert "receive_after_materialization" in socketio.asyncapi_doc.dict()["operations"]
+
+
+def test_lazy_docs_restore_the_snapshot_document(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot.json"
+    socketio = make_socketio(path)
+    socketio.materialize_docs()
+    first = socketio.asyncapi_doc.dict()
+
+    clear_schema_cache()
+    monkeypatch.setattr(snapshot.SpecSnapshot, "schema", lambda *args: 1 / 0)
+    socketio = AsyncAPISocketIO(Flask(__name__), spec_snapshot=path, lazy_docs=True)
+
+    @socketio.on("snapshot_request", request_model=SnapshotRequest, response_model=SnapshotItem)
+    def handle(request):
+        """Handle a request"""
+
+    thread = socketio.materialize_docs(background=True)
+    thread.join()
+    assert socketio.asyncapi_doc.dict() == first
@@ -0,0 +1,78 @@
+import gzip
+import json
+
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPISocketIO
+
+
+class Ping(BaseModel):
+    count: int
+
+
+def make_app(**kwargs):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, spec_routes=True, **kwargs)
+
+    @socketio.on("ping", request_model=Ping)
+    def ping(request):
+        """Ping the server"""
+
+    return app, socketio
+
+
+def test_spec_routes_serve_the_documents():
+    app, socketio = make_app()
+    client = app.test_client()
+
+    response = client.get("/asyncapi.json")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert response.json == json.loads(socketio.asyncapi_doc.json())
+
+    response = client.get("/asyncapi.yaml")
+    assert response.mimetype == "application/yaml"
+    assert response.get_data(as_text=True) == socketio.asyncapi_doc.get_yaml()
+
+    response = client.get("/agent-schema.json")
+    assert response.json["events"][0]["name"] == "ping"
+
+
+def test_spec_routes_compress_and_answer_not_modified():
+    app, socketio = make_app()
+    client = app.test_client()
+
+    response = client.get("/asyncapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).decode() == socketio.asyncapi_doc.json()
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/asyncapi.json",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+    identity = client.get("/asyncapi.json").headers["ETag"]
+    assert identity != etag
+
+    @socketio.on("pong")
+    def pong():
+        pass
+
+    response = client.get("/asyncapi.json", headers={"If-None-Match": identity})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != identity
+
+
+def test_spec_routes_are_opt_in_and_prefixable():
+    app = Flask(__name__)
+    AsyncAPISocketIO(app)
+    assert app.test_client().get("/asyncapi.json").status_code == 404
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(spec_routes=True, spec_url_prefix="/docs/")
+    socketio.init_app(app)
+    assert app.test_client().get("/docs/asyncapi.yaml").status_code == 200
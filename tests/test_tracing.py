@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+from flask import Flask
+from pydantic import BaseModel
+
+from sio_asyncapi import AsyncAPIAsyncServer, AsyncAPISocketIO, Tracer
+from sio_asyncapi.tracing import JsonLinesExporter, RingBufferExporter
+
+
+class Ping(BaseModel):
+    count: int
+
+
+class Pong(BaseModel):
+    count: int
+
+
+def make_server(tracer: Tracer):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, tracer=tracer)
+
+    @socketio.doc_emit("pong", Pong)
+    def pong():
+        pass
+
+    @socketio.on("ping", request_model=Ping, response_model=Pong)
+    def ping(request: Ping):
+        socketio.emit("pong", {"count": request.count})
+        return Pong(count=request.count + 1)
+
+    return app, socketio
+
+
+def test_event_phases_are_nested_spans():
+    exporter = RingBufferExporter()
+    app, socketio = make_server(Tracer(exporter))
+    client = socketio.test_client(app)
+    client.emit("ping", {"count": 1}, callback=True)
+
+    spans = {span.name: span for span in exporter.spans()}
+    root = spans["event"]
+    assert root.parent_id is None
+    assert root.attributes["event"] == "ping"
+    assert root.attributes["namespace"] == "/"
+    assert root.attributes["sid"]
+    assert root.attributes["payload_size"] > 0
+    for phase in ("request_validation", "handler", "response_validation", "serialization"):
+        assert spans[phase].parent_id == root.span_id
+        assert spans[phase].trace_id == root.trace_id
+    assert spans["emit"].parent_id == spans["handler"].span_id
+    assert spans["emit_validation"].parent_id == spans["emit"].span_id
+    assert exporter.spans()[-1] is root
+    assert root.duration_ns >= spans["handler"].duration_ns
+
+
+def test_failed_phases_record_the_error():
+    exporter = RingBufferExporter()
+    app, socketio = make_server(Tracer(exporter))
+
+    @socketio.on_error_default
+    def error_handler(e):
+        return {"error": "invalid"}
+
+    socketio.test_client(app).emit("ping", {"count": "x"}, callback=True)
+    spans = {span.name: span for span in exporter.spans()}
+    assert spans["request_validation"].error.startswith("RequestValidationError")
+    assert "handler" not in spans
+
+
+def test_unsampled_traces_record_no_spans():
+    exporter = RingBufferExporter()
+    app, socketio = make_server(Tracer(exporter, sample_rate=0.0))
+    socketio.test_client(app).emit("ping", {"count": 1}, callback=True)
+    assert exporter.spans() == []
+
+
+def test_json_lines_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonLinesExporter(path)
+    tracer = Tracer(exporter)
+    with tracer.span("outer", job="export"):
+        with tracer.span("inner"):
+            pass
+    exporter.shutdown()
+
+    inner, outer = [json.loads(line) for line in path.read_text().splitlines()]
+    assert outer["name"] == "outer" and outer["attributes"] == {"job": "export"}
+    assert inner["parent_id"] == outer["span_id"]
+    assert inner["trace_id"] == outer["trace_id"]
+
+
+def test_async_handlers_are_traced():
+    exporter = RingBufferExporter()
+    sio = AsyncAPIAsyncServer(async_mode="asgi", validate=True, tracer=Tracer(exporter))
+
+    @sio.on("ping", request_model=Ping, response_model=Pong)
+    async def ping(sid, request: Ping):
+        return Pong(count=request.count + 1)
+
+    asyncio.run(sio.handlers["/"]["ping"]("sid-1", {"count": 1}))
+    spans = {span.name: span for span in exporter.spans()}
+    assert spans["event"].attributes["sid"] == "sid-1"
+    assert spans["handler"].parent_id == spans["event"].span_id
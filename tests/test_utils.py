@@ -1,6 +1,7 @@
 from hypothesis_auto import auto_pytest_magic
 from sio_asyncapi.asyncapi.utils import insert_prepath
 from sio_asyncapi.asyncapi.utils import add_ref_prepath
+from sio_asyncapi.asyncapi.utils import map_refs
 
 auto_pytest_magic(insert_prepath)
 auto_pytest_magic(add_ref_prepath)
@@ -49,3 +50,37 @@ def test_add_ref_prepath():
             {'properties': {'field': {'$ref': '#/new/definitions/Field'}}}
         ]
     }
+
+def test_add_ref_prepath_handles_deeply_nested_schemas():
+    dict_obj = leaf = {}
+    for _ in range(10_000):
+        leaf['items'] = [{'properties': {}}]
+        leaf = leaf['items'][0]['properties']
+    leaf['$ref'] = '#/definitions/Test'
+
+    add_ref_prepath(dict_obj, '/new')
+    assert leaf == {'$ref': '#/new/definitions/Test'}
+
+
+def test_map_refs_copies_only_changed_paths():
+    shared = {'type': 'string'}
+    schema = {
+        'properties': {
+            'field': {'$ref': '#/definitions/Field'},
+            'plain': shared,
+        },
+        'items': [shared, {'$ref': '#/definitions/Item'}],
+    }
+
+    mapped = map_refs(schema, lambda ref: insert_prepath('/new', ref))
+    assert mapped == {
+        'properties': {
+            'field': {'$ref': '#/new/definitions/Field'},
+            'plain': {'type': 'string'},
+        },
+        'items': [{'type': 'string'}, {'$ref': '#/new/definitions/Item'}],
+    }
+    assert schema['properties']['field'] == {'$ref': '#/definitions/Field'}
+    assert mapped['properties']['plain'] is shared
+    assert mapped['items'][0] is shared
+    assert map_refs(schema, lambda ref: ref) is schema
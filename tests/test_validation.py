@@ -1,9 +1,13 @@
+import json
+from typing import Dict, List, Optional
+
 from flask import Flask
 from flask_socketio import SocketIOTestClient
 import pytest
 from pydantic import BaseModel
 
-from sio_asyncapi import EmitValidationError, RequestValidationError, ResponseValidationError
+from sio_asyncapi import (EmitValidationError, ModelAdapter, RequestValidationError,
+                          ResponseValidationError, register_model_adapter)
 from sio_asyncapi.application import AsyncAPISocketIO
 
 from .fixtures import client, downloader_queue
@@ -110,3 +114,508 @@ def test_emit_validation_is_namespace_aware():
 
     with pytest.raises(EmitValidationError):
         socketio.emit("status", {"count": 1})
+
+
+def test_validation_wrapper_is_built_once_per_handler(monkeypatch):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    class PingRequest(BaseModel):
+        count: int
+
+    class PingResponse(BaseModel):
+        count: int
+
+    handle_all_calls = []
+    original_handle_all = socketio._handle_all
+
+    def counting_handle_all(*args, **kwargs):
+        handle_all_calls.append(kwargs)
+        return original_handle_all(*args, **kwargs)
+
+    monkeypatch.setattr(socketio, "_handle_all", counting_handle_all)
+
+    @socketio.on("ping", request_model=PingRequest, response_model=PingResponse)
+    def handle_ping(request):
+        return PingResponse(count=request.count + 1)
+
+    for count in range(3):
+        assert json.loads(handle_ping({"count": count})) == {"count": count + 1}
+
+    assert len(handle_all_calls) == 1
+
+
+def test_request_payload_is_validated_once_per_event(monkeypatch):
+    from sio_asyncapi import base
+
+    validated = []
+    original_get_model_adapter = base.get_model_adapter
+
+    def counting_get_model_adapter(model):
+        adapter = original_get_model_adapter(model)
+
+        def counting_validate(data):
+            validated.append(model)
+            return adapter.validate(data)
+
+        return ModelAdapter(
+            model,
+            validate=counting_validate,
+            dump=adapter.dump,
+            dump_jsonable=adapter.dump_jsonable,
+            dump_json=adapter.dump_json,
+            schema=adapter.schema,
+        )
+
+    monkeypatch.setattr(base, "get_model_adapter", counting_get_model_adapter)
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    class CountRequest(BaseModel):
+        count: int
+
+    @socketio.on("count", request_model=CountRequest)
+    def handle_count(request):
+        return request.count
+
+    assert handle_count({"count": "3"}) == 3
+    assert validated == [CountRequest]
+
+    with pytest.raises(RequestValidationError):
+        handle_count({"count": "three"})
+    assert validated == [CountRequest, CountRequest]
+
+
+def test_model_adapter_is_resolved_once_per_model_class():
+    from sio_asyncapi._compat import get_model_adapter, model_dump_json, model_validate
+
+    class CachedModel(BaseModel):
+        count: int
+
+    adapter = get_model_adapter(CachedModel)
+    assert get_model_adapter(CachedModel) is adapter
+    assert adapter.model is CachedModel
+
+    instance = model_validate(CachedModel, {"count": "2"})
+    assert isinstance(instance, CachedModel)
+    assert json.loads(model_dump_json(instance)) == {"count": 2}
+    assert adapter.dump(instance) == {"count": 2}
+    assert adapter.schema()["title"] == "CachedModel"
+
+    with pytest.raises(TypeError):
+        get_model_adapter(dict)
+
+
+def test_model_checks_cache_the_classes_of_plain_payloads():
+    from sio_asyncapi import _compat
+
+    class Plain:
+        pass
+
+    class Checked(BaseModel):
+        count: int
+
+    for value in (None, {}, [], "ack", 1):
+        assert not _compat.is_model_instance(value)
+    assert not _compat.is_model_instance(Plain())
+    assert Plain in _compat._NON_MODEL_TYPES
+    assert _compat.is_model_instance(Checked(count=1))
+    assert Checked in _compat._MODEL_TYPES
+
+
+def test_emit_accepts_model_instances_without_revalidation(monkeypatch):
+    from sio_asyncapi import base
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    class Progress(BaseModel):
+        percent: int
+        label: str = "download"
+
+    @socketio.doc_emit("progress", Progress)
+    def register_emit():
+        return None
+
+    client = socketio.test_client(app)
+    adapter = base.get_model_adapter(Progress)
+    monkeypatch.setattr(
+        base,
+        "get_model_adapter",
+        lambda model: ModelAdapter(
+            model,
+            validate=pytest.fail,
+            dump=adapter.dump,
+            dump_jsonable=adapter.dump_jsonable,
+            dump_json=adapter.dump_json,
+            schema=adapter.schema,
+        ),
+    )
+
+    socketio.emit("progress", Progress(percent=50))
+    received = client.get_received()
+    assert received == [
+        {"name": "progress", "args": [{"percent": 50, "label": "download"}], "namespace": "/"}
+    ]
+
+
+def test_serialize_emits_sends_validated_payload():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, serialize_emits=True)
+
+    class Progress(BaseModel):
+        percent: int
+        label: str = "download"
+
+    @socketio.doc_emit("progress", Progress)
+    def register_emit():
+        return None
+
+    client = socketio.test_client(app)
+    socketio.emit("progress", {"percent": "75"})
+    assert client.get_received()[0]["args"] == [{"percent": 75, "label": "download"}]
+
+    with pytest.raises(EmitValidationError):
+        socketio.emit("progress", {"percent": "all"})
+
+
+def test_serialize_emits_reaches_broadcast_and_targeted_recipients():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, serialize_emits=True)
+
+    class Progress(BaseModel):
+        percent: int
+
+    @socketio.doc_emit("progress", Progress)
+    def register_emit():
+        return None
+
+    clients = [socketio.test_client(app) for _ in range(3)]
+
+    socketio.emit("progress", Progress(percent=10))
+    for client in clients:
+        assert client.get_received() == [
+            {"name": "progress", "args": [{"percent": 10}], "namespace": "/"}
+        ]
+
+    first_sid = socketio.server.manager.sid_from_eio_sid(clients[0].eio_sid, "/")
+    socketio.emit("progress", {"percent": 20}, to=first_sid)
+    assert clients[0].get_received()[0]["args"] == [{"percent": 20}]
+    assert clients[1].get_received() == []
+
+
+def test_room_emits_are_encoded_once_for_all_recipients(monkeypatch):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, serialize_emits=True)
+
+    class Progress(BaseModel):
+        percent: int
+
+    @socketio.doc_emit("progress", Progress)
+    def register_emit():
+        return None
+
+    server = socketio.server
+    for eio_sid in ("eio-1", "eio-2", "eio-3"):
+        server.enter_room(server.manager.connect(eio_sid, "/"), "watchers", namespace="/")
+
+    encode = server.packet_class.encode
+    encoded = []
+    sent = []
+
+    def counting_encode(pkt):
+        encoded.append(pkt.data)
+        return encode(pkt)
+
+    monkeypatch.setattr(server.packet_class, "encode", counting_encode)
+    monkeypatch.setattr(server.eio, "send_packet", lambda eio_sid, eio_pkt: sent.append((eio_sid, eio_pkt.data)))
+    socketio.emit("progress", Progress(percent=30), to="watchers")
+
+    assert encoded == [["progress", {"percent": 30}]]
+    assert sent == [(eio_sid, '2["progress",{"percent":30}]') for eio_sid in ("eio-1", "eio-2", "eio-3")]
+
+def test_validation_policies_skip_or_count_violations():
+    from sio_asyncapi.validation import ValidationPolicy
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(
+        app,
+        validate=True,
+        generate_docs=False,
+        namespace_validation_policies={"/telemetry": ValidationPolicy.never()},
+    )
+
+    class Reading(BaseModel):
+        value: int
+
+    @socketio.on("reading", namespace="/telemetry", request_model=Reading)
+    def handle_reading(request):
+        return request.value
+
+    @socketio.on(
+        "counted",
+        request_model=Reading,
+        response_model=Reading,
+        validation_policy=ValidationPolicy.always(raise_errors=False),
+    )
+    def handle_counted(request):
+        return {"value": "not a number"}
+
+    @socketio.doc_emit("sampled", Reading, validation_policy=ValidationPolicy.sample(0.0))
+    def register_emit():
+        return None
+
+    assert handle_reading({"value": "not a number"}) == "not a number"
+    assert handle_counted({"value": "nan"}) == {"value": "not a number"}
+    socketio.emit("sampled", {"value": "not a number"})
+
+    assert socketio.validation_violations == {
+        ("request", "counted", "/"): 1,
+        ("response", "counted", "/"): 1,
+    }
+
+
+def test_unvalidated_requests_build_nested_models():
+    from sio_asyncapi.validation import ValidationPolicy
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    class Point(BaseModel):
+        x: int
+
+    class Shape(BaseModel):
+        origin: Point
+        points: List[Point]
+        named: Optional[Dict[str, Point]] = None
+
+    received = []
+
+    @socketio.on("shape", request_model=Shape, validation_policy=ValidationPolicy.never())
+    def handle_shape(request):
+        received.append(request)
+
+    handle_shape({"origin": {"x": 1}, "points": [{"x": 2}], "named": {"a": {"x": "3"}}})
+    shape = received[0]
+    assert isinstance(shape, Shape)
+    assert shape.origin.x == 1
+    assert [point.x for point in shape.points] == [2]
+    assert shape.named is not None and shape.named["a"].x == "3"
+
+
+def test_invalid_non_object_request_reaches_handler_as_received():
+    from sio_asyncapi.validation import ValidationPolicy
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    class Reading(BaseModel):
+        value: int
+
+    @socketio.on(
+        "reading",
+        request_model=Reading,
+        validation_policy=ValidationPolicy.always(raise_errors=False),
+    )
+    def handle_reading(request):
+        return request
+
+    assert handle_reading("garbage") == "garbage"
+    assert socketio.validation_violations == {("request", "reading", "/"): 1}
+
+
+def test_unvalidated_non_object_requests_are_not_validated():
+    import pydantic
+
+    from sio_asyncapi.validation import ValidationPolicy
+
+    model_validator = getattr(pydantic, "model_validator", None)
+    if model_validator is None:
+        pytest.skip("model_validator needs Pydantic 2")
+    validated = []
+
+    class Reading(BaseModel):
+        value: int
+
+        @model_validator(mode="before")
+        @classmethod
+        def record(cls, data):
+            validated.append(data)
+            return data
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+    received = []
+
+    @socketio.on("readings", request_model=Reading, validation_policy=ValidationPolicy.never())
+    def handle_readings(request):
+        received.append(request)
+
+    handle_readings([{"value": 1}, {"value": 2}])
+    handle_readings(3)
+    assert received == [[{"value": 1}, {"value": 2}], 3]
+    assert validated == []
+
+
+def test_first_per_sid_policy_validates_first_messages_only():
+    from sio_asyncapi.validation import ValidationPolicy
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(
+        app,
+        generate_docs=False,
+        validation_policy=ValidationPolicy.first_per_sid(1),
+    )
+
+    class Reading(BaseModel):
+        value: int
+
+    @socketio.on("reading", request_model=Reading)
+    def handle_reading(request):
+        return request.value
+
+    with pytest.raises(RequestValidationError):
+        handle_reading({"value": "not a number"})
+    assert handle_reading({"value": "not a number"}) == "not a number"
+    assert socketio.validation_violations[("request", "reading", "/")] == 1
+
+
+@pytest.mark.parametrize("ack_serializer", ["model", "json", "auto", json.dumps])
+def test_ack_serializer_backends_return_json(ack_serializer):
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, ack_serializer=ack_serializer)
+
+    class Ack(BaseModel):
+        success: bool = True
+        error: str = "ünïcode"
+
+    @socketio.on("ack", response_model=Ack)
+    def handle_ack():
+        return Ack()
+
+    assert json.loads(handle_ack()) == {"success": True, "error": "ünïcode"}
+
+
+def test_ack_serializer_dict_is_encoded_once_by_socketio():
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False, ack_serializer="dict")
+
+    class Ack(BaseModel):
+        success: bool = True
+
+    @socketio.on("ack", response_model=Ack)
+    def handle_ack():
+        return Ack()
+
+    assert handle_ack() == {"success": True}
+    client = socketio.test_client(app)
+    assert client.emit("ack", callback=True) == {"success": True}
+
+
+def test_ack_serializer_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        AsyncAPISocketIO(Flask(__name__), ack_serializer="yaml")
+
+
+def test_dataclass_models_are_validated_and_documented():
+    import dataclasses
+
+    @dataclasses.dataclass
+    class Point:
+        x: int
+        y: int = 0
+
+    @dataclasses.dataclass
+    class Distance:
+        value: float
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=True)
+
+    @socketio.on("distance", get_from_typehint=True)
+    def handle_distance(request: Point) -> Distance:
+        assert isinstance(request, Point)
+        return Distance(value=float(request.x - request.y))
+
+    assert json.loads(handle_distance({"x": "3", "y": 1})) == {"value": 2.0}
+    with pytest.raises(RequestValidationError):
+        handle_distance({"x": "three"})
+
+    schemas = socketio.asyncapi_doc.dict()["components"]["schemas"]
+    assert "Point" in schemas
+    assert "Distance" in schemas
+
+
+def test_registered_model_adapters_validate_custom_classes(monkeypatch):
+    from sio_asyncapi import _compat
+
+    monkeypatch.setattr(_compat, "_ADAPTER_FACTORIES", list(_compat._ADAPTER_FACTORIES))
+    monkeypatch.setattr(_compat, "MODEL_VALIDATION_ERRORS", _compat.MODEL_VALIDATION_ERRORS)
+    monkeypatch.setattr(_compat, "_NON_MODEL_TYPES", set(_compat._NON_MODEL_TYPES))
+
+    class Slotted:
+        __slots__ = ("name",)
+
+        def __init__(self, name: str) -> None:
+            if not isinstance(name, str):
+                raise TypeError("name must be a string")
+            self.name = name
+
+    def slotted_adapter(model):
+        return ModelAdapter(
+            model,
+            validate=lambda data: data if isinstance(data, model) else model(**data),
+            dump=lambda instance: {"name": instance.name},
+            dump_jsonable=lambda instance: {"name": instance.name},
+            dump_json=lambda instance: json.dumps({"name": instance.name}),
+            schema=lambda: {"type": "object", "properties": {"name": {"type": "string"}}},
+        )
+
+    assert not _compat.is_model_type(Slotted)
+    register_model_adapter(lambda model: model is Slotted, slotted_adapter, validation_errors=(TypeError,))
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=False)
+
+    @socketio.on("greet", request_model=Slotted, response_model=Slotted)
+    def greet(request):
+        assert isinstance(request, Slotted)
+        return request
+
+    assert json.loads(greet({"name": "Ada"})) == {"name": "Ada"}
+    with pytest.raises(RequestValidationError):
+        greet({"name": 1})
+
+
+def test_msgspec_struct_models_are_validated():
+    msgspec = pytest.importorskip("msgspec")
+
+    class Reading(msgspec.Struct):
+        sensor: str
+        value: float
+
+    app = Flask(__name__)
+    socketio = AsyncAPISocketIO(app, validate=True, generate_docs=True, serialize_emits=True)
+
+    @socketio.on("reading", request_model=Reading, response_model=Reading)
+    def handle_reading(request):
+        assert isinstance(request, Reading)
+        return request
+
+    @socketio.doc_emit("reading_broadcast", Reading)
+    def register_emit():
+        return None
+
+    assert json.loads(handle_reading({"sensor": "a", "value": 1.5})) == {"sensor": "a", "value": 1.5}
+    with pytest.raises(RequestValidationError) as exc_info:
+        handle_reading({"sensor": "a", "value": "high"})
+    assert exc_info.value.errors()[0]["msg"]
+
+    client = socketio.test_client(app)
+    socketio.emit("reading_broadcast", Reading(sensor="b", value=2.0))
+    assert client.get_received()[0]["args"] == [{"sensor": "b", "value": 2.0}]
+    with pytest.raises(EmitValidationError):
+        socketio.emit("reading_broadcast", {"sensor": "b"})
+
+    assert "Reading" in socketio.asyncapi_doc.dict()["components"]["schemas"]